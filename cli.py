@@ -171,7 +171,7 @@ class VernaChainCLI:
             print("Node not started. Please start the node first.")
             return
             
-        block = self.node.blockchain.create_block(args.address)
+        block = self.node.blockchain.create_shard_block(args.address)
         if block:
             self.node.broadcast_block(block)
             print(f"Successfully created block {block.index}")
@@ -8,6 +8,7 @@ import os
 from typing import Dict, Any, Optional, List, Union
 import json
 import logging
+from cachetools import LRUCache
 from web3.middleware import geth_poa_middleware
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,7 @@ class BlockchainClient:
     def __init__(self):
         self.node_url = os.getenv("BLOCKCHAIN_NODE_URL", "http://localhost:8545")
         self.chain_id = int(os.getenv("CHAIN_ID", "1"))
+        self.avg_block_time = int(os.getenv("AVG_BLOCK_TIME", "15"))  # seconds
         self.web3 = Web3(Web3.HTTPProvider(self.node_url))
         
         # Add PoA middleware if needed
@@ -36,6 +38,9 @@ class BlockchainClient:
         self.staking_address = os.getenv("STAKING_ADDRESS")
         self.governance_address = os.getenv("GOVERNANCE_ADDRESS")
         self.nft_factory_address = os.getenv("NFT_FACTORY_ADDRESS")
+        
+        # ERC20 contract instances by token address
+        self._token_contracts: LRUCache = LRUCache(maxsize=1024)
 
     def _load_abi(self, name: str) -> Dict:
         """Load contract ABI from file"""
@@ -46,6 +51,14 @@ class BlockchainClient:
             logger.error(f"Failed to load {name} ABI: {e}")
             return {}
 
+    def token_contract(self, address: str):
+        """Get a cached ERC20 contract instance for a token address"""
+        contract = self._token_contracts.get(address)
+        if contract is None:
+            contract = self.web3.eth.contract(address=address, abi=self.token_abi)
+            self._token_contracts[address] = contract
+        return contract
+
     # Token Operations
     def create_token(self, params: Dict[str, Any]) -> str:
         """Create a new token contract"""
@@ -70,10 +83,7 @@ class BlockchainClient:
 
     def get_token_info(self, token_address: str) -> Dict[str, Any]:
         """Get token information"""
-        token = self.web3.eth.contract(
-            address=token_address,
-            abi=self.token_abi
-        )
+        token = self.token_contract(token_address)
         return {
             "name": token.functions.name().call(),
             "symbol": token.functions.symbol().call(),
@@ -84,10 +94,7 @@ class BlockchainClient:
     # Token Holder Operations
     def get_token_holders(self, token_address: str, from_block: int = 0) -> List[Dict[str, Any]]:
         """Get list of token holders from transfer events"""
-        token = self.web3.eth.contract(
-            address=token_address,
-            abi=self.token_abi
-        )
+        token = self.token_contract(token_address)
         transfer_events = token.events.Transfer.get_logs(fromBlock=from_block)
         holders = {}
         
@@ -229,10 +236,7 @@ class BlockchainClient:
     def transfer_tokens(self, token_address: str, from_address: str, 
                        to_address: str, amount: str) -> str:
         """Transfer tokens"""
-        token = self.web3.eth.contract(
-            address=token_address,
-            abi=self.token_abi
-        )
+        token = self.token_contract(token_address)
         tx = token.functions.transfer(
             to_address,
             int(amount)
@@ -246,10 +250,7 @@ class BlockchainClient:
     def mint_tokens(self, token_address: str, to_address: str, 
                    amount: str, owner_address: str) -> str:
         """Mint new tokens"""
-        token = self.web3.eth.contract(
-            address=token_address,
-            abi=self.token_abi
-        )
+        token = self.token_contract(token_address)
         tx = token.functions.mint(
             to_address,
             int(amount)
@@ -263,10 +264,7 @@ class BlockchainClient:
     def burn_tokens(self, token_address: str, amount: str, 
                    owner_address: str) -> str:
         """Burn tokens"""
-        token = self.web3.eth.contract(
-            address=token_address,
-            abi=self.token_abi
-        )
+        token = self.token_contract(token_address)
         tx = token.functions.burn(
             int(amount)
         ).build_transaction({
@@ -503,10 +501,7 @@ class BlockchainClient:
                          holder_address: str, token_id: int = None) -> str:
         """Get token balance for any token type"""
         if token_type == "erc20":
-            token = self.web3.eth.contract(
-                address=token_address,
-                abi=self.token_abi
-            )
+            token = self.token_contract(token_address)
             return str(token.functions.balanceOf(holder_address).call())
         elif token_type == "erc721":
             token = self.web3.eth.contract(
@@ -2,7 +2,7 @@
 Database integration for the API service.
 """
 
-from sqlalchemy import create_engine, ForeignKey, Enum
+from sqlalchemy import create_engine, ForeignKey, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy import Column, String, DateTime, Boolean, Integer, JSON, Text
@@ -115,6 +115,10 @@ class DBTransaction(Base):
 class DBTokenHolder(Base):
     """Token holder database model"""
     __tablename__ = "token_holders"
+    __table_args__ = (
+        # Target of the ON CONFLICT upsert in TransactionMonitor
+        Index("uq_token_holder", "token_id", "holder_address", unique=True),
+    )
 
     id = Column(String, primary_key=True)
     token_id = Column(String, ForeignKey("tokens.id"))
@@ -137,4 +141,7 @@ def get_db():
 # Create all tables
 def init_db():
     """Initialize database"""
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add indexes introduced since
+    for index in DBTokenHolder.__table__.indexes:
+        index.create(bind=engine, checkfirst=True) 
\ No newline at end of file
@@ -2,8 +2,9 @@
 Governance service for managing DAO operations.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
+import time
 from ..database import SessionLocal, DBToken, DBTransaction
 from ..blockchain.client import BlockchainClient
 from datetime import datetime, timedelta
@@ -15,6 +16,8 @@ logger = logging.getLogger(__name__)
 class GovernanceService:
     def __init__(self):
         self.blockchain = BlockchainClient()
+        self.head_cache_ttl = 2  # seconds
+        self._head_cache: Optional[Tuple[int, int, float]] = None
 
     def create_proposal(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new governance proposal"""
@@ -169,16 +172,19 @@ class GovernanceService:
         """Get detailed voting statistics"""
         try:
             votes = self.blockchain.get_proposal_votes(proposal_id)
-            total_votes = votes["for_votes"] + votes["against_votes"]
+            for_votes = votes["for_votes"]
+            against_votes = votes["against_votes"]
+            total_votes = for_votes + against_votes
+            scale = 100 / total_votes if total_votes > 0 else 0
             
             return {
                 "total_votes": total_votes,
-                "for_votes": votes["for_votes"],
-                "against_votes": votes["against_votes"],
-                "for_percentage": (votes["for_votes"] / total_votes * 100) if total_votes > 0 else 0,
-                "against_percentage": (votes["against_votes"] / total_votes * 100) if total_votes > 0 else 0,
-                "quorum_reached": self._check_quorum(votes["for_votes"] + votes["against_votes"]),
-                "vote_differential": votes["for_votes"] - votes["against_votes"]
+                "for_votes": for_votes,
+                "against_votes": against_votes,
+                "for_percentage": for_votes * scale,
+                "against_percentage": against_votes * scale,
+                "quorum_reached": self._check_quorum(total_votes),
+                "vote_differential": for_votes - against_votes
             }
         except Exception as e:
             logger.error(f"Error getting voting stats: {e}")
@@ -203,10 +209,11 @@ class GovernanceService:
 
     def _get_proposal_timeline(self, proposal: Dict[str, Any]) -> Dict[str, Any]:
         """Generate proposal timeline"""
+        head = self._get_head()
         return {
             "created_at": proposal.get("created_at"),
-            "voting_starts": self._block_to_timestamp(proposal["start_block"]),
-            "voting_ends": self._block_to_timestamp(proposal["end_block"]),
+            "voting_starts": self._block_to_timestamp(proposal["start_block"], head),
+            "voting_ends": self._block_to_timestamp(proposal["end_block"], head),
             "queued_at": proposal.get("queued_at"),
             "executed_at": proposal.get("executed_at")
         }
@@ -240,21 +247,34 @@ class GovernanceService:
             logger.error(f"Error checking quorum: {e}")
             return False
 
-    def _block_to_timestamp(self, block_number: int) -> int:
-        """Convert block number to estimated timestamp"""
+    def _get_head(self) -> Optional[Tuple[int, int]]:
+        """Get the latest block number and timestamp, cached briefly"""
+        now = time.time()
+        if self._head_cache and now - self._head_cache[2] < self.head_cache_ttl:
+            return self._head_cache[0], self._head_cache[1]
+
         try:
             current_block = self.blockchain.web3.eth.block_number
             current_block_data = self.blockchain.web3.eth.get_block(current_block)
-            avg_block_time = 15  # seconds
-            
-            block_difference = block_number - current_block
-            time_difference = block_difference * avg_block_time
-            
-            return current_block_data["timestamp"] + time_difference
         except Exception as e:
-            logger.error(f"Error converting block to timestamp: {e}")
+            logger.error(f"Error fetching latest block: {e}")
+            return None
+
+        self._head_cache = (current_block, current_block_data["timestamp"], now)
+        return current_block, current_block_data["timestamp"]
+
+    def _block_to_timestamp(self, block_number: int,
+                            head: Optional[Tuple[int, int]] = None) -> int:
+        """Convert block number to estimated timestamp"""
+        if head is None:
+            head = self._get_head()
+        if head is None:
             return 0
 
+        current_block, current_timestamp = head
+        block_difference = block_number - current_block
+        return current_timestamp + block_difference * self.blockchain.avg_block_time
+
     def _is_proposal_cancelable(self, proposal_id: int) -> bool:
         """Check if proposal can be canceled"""
         try:
@@ -5,13 +5,23 @@ Transaction monitoring service for tracking blockchain transactions.
 import asyncio
 from typing import Dict, Any, List
 import logging
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from ..database import SessionLocal, DBTransaction, DBToken, DBTokenHolder, TransactionStatus
 from ..blockchain.client import BlockchainClient
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 
 logger = logging.getLogger(__name__)
 
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# Dialect-specific INSERT constructs supporting ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
 class TransactionMonitor:
     def __init__(self):
         self.blockchain = BlockchainClient()
@@ -31,10 +41,12 @@ class TransactionMonitor:
         """Check status of pending transactions"""
         db = SessionLocal()
         try:
-            # Get all pending transactions
+            # Get pending transactions old enough to have been mined
+            mature_before = datetime.utcnow() - timedelta(seconds=self.blockchain.avg_block_time)
             pending_txs = db.query(DBTransaction).filter(
-                DBTransaction.status == TransactionStatus.PENDING
-            ).all()
+                DBTransaction.status == TransactionStatus.PENDING,
+                DBTransaction.created_at < mature_before
+            ).order_by(DBTransaction.created_at).all()
 
             for tx in pending_txs:
                 # Get transaction receipt
@@ -84,20 +96,15 @@ class TransactionMonitor:
                 return
 
             # Get token contract
-            token_contract = self.blockchain.web3.eth.contract(
-                address=token.contract_address,
-                abi=self.blockchain.token_abi
-            )
+            token_contract = self.blockchain.token_contract(token.contract_address)
 
-            # Update sender balance
-            if tx.from_address != "0x0000000000000000000000000000000000000000":
-                from_balance = token_contract.functions.balanceOf(tx.from_address).call()
-                self._update_holder_balance(db, token.id, tx.from_address, str(from_balance))
+            # Collect sender and receiver balances
+            balances = {}
+            for address in (tx.from_address, tx.to_address):
+                if address and address != ZERO_ADDRESS and address not in balances:
+                    balances[address] = str(token_contract.functions.balanceOf(address).call())
 
-            # Update receiver balance
-            if tx.to_address != "0x0000000000000000000000000000000000000000":
-                to_balance = token_contract.functions.balanceOf(tx.to_address).call()
-                self._update_holder_balance(db, token.id, tx.to_address, str(to_balance))
+            self._upsert_holder_balances(db, token.id, balances)
 
             # Update total supply
             token.total_supply = str(token_contract.functions.totalSupply().call())
@@ -107,6 +114,40 @@ class TransactionMonitor:
             logger.error(f"Error updating balances: {e}")
             db.rollback()
 
+    def _upsert_holder_balances(self, db, token_id: str, balances: Dict[str, str]):
+        """Insert or update token holder balances in a single statement"""
+        if not balances:
+            return
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "token_id": token_id,
+                "holder_address": holder_address,
+                "balance": balance,
+                "last_updated": now
+            }
+            for holder_address, balance in balances.items()
+        ]
+
+        insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if insert is None:
+            # Fall back to per-holder read-then-write on other backends
+            for row in rows:
+                self._update_holder_balance(db, token_id, row["holder_address"], row["balance"])
+            return
+
+        stmt = insert(DBTokenHolder).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["token_id", "holder_address"],
+            set_={
+                "balance": stmt.excluded.balance,
+                "last_updated": stmt.excluded.last_updated
+            }
+        )
+        db.execute(stmt)
+
     def _update_holder_balance(self, db, token_id: str, holder_address: str, balance: str):
         """Update or create token holder balance"""
         holder = db.query(DBTokenHolder).filter(
@@ -13,12 +13,13 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import base64
-import json
+import orjson
 import uuid
 import time
 import hmac
 import hashlib
 import pyotp
+from src.utils.crypto import get_totp
 
 logger = logging.getLogger(__name__)
 
@@ -58,10 +59,10 @@ class WalletManager:
         salt = os.urandom(16)
         key = self._derive_key(password.encode(), salt)
         encrypted_key = self._encrypt_private_key(account.key.hex(), key)
-        return account.address, json.dumps({
+        return account.address, orjson.dumps({
             "key": encrypted_key,
             "salt": base64.b64encode(salt).decode()
-        })
+        }).decode()
 
     def _encrypt_private_key(self, private_key: str, key: bytes) -> str:
         """Encrypt private key with additional security"""
@@ -148,8 +149,7 @@ class WalletManager:
 
     def verify_2fa(self, secret: str, code: str) -> bool:
         """Verify 2FA code"""
-        totp = pyotp.TOTP(secret)
-        return totp.verify(code)
+        return get_totp(secret).verify(code)
 
     def check_transaction_limits(self, address: str, amount: int) -> bool:
         """Check if transaction is within limits"""
@@ -193,7 +193,7 @@ class WalletManager:
         if not self.verify_2fa(secret, code):
             raise ValueError("Invalid 2FA code")
             
-        key_data = json.loads(encrypted_key_data)
+        key_data = orjson.loads(encrypted_key_data)
         key = self._derive_key(
             password.encode(),
             base64.b64decode(key_data["salt"])
@@ -216,7 +216,7 @@ class WalletManager:
         export_password: str
     ) -> str:
         """Export wallet with additional encryption"""
-        key_data = json.loads(encrypted_key_data)
+        key_data = orjson.loads(encrypted_key_data)
         key = self._derive_key(
             password.encode(),
             base64.b64decode(key_data["salt"])
@@ -236,7 +236,7 @@ class WalletManager:
             "crypto": self._create_keystore_crypto(private_key, export_key, export_salt)
         }
         
-        return json.dumps(keystore)
+        return orjson.dumps(keystore).decode()
 
     def _create_keystore_crypto(
         self,
@@ -339,12 +339,12 @@ class WalletManager:
         private_key = self.decrypt_private_key(encrypted_private_key)
         account = Account.from_key(private_key)
         keystore = account.encrypt(password)
-        return json.dumps(keystore)
+        return orjson.dumps(keystore).decode()
 
     def import_wallet(self, keystore_json: str, password: str) -> Tuple[str, str]:
         """Import wallet from encrypted JSON keystore"""
         try:
-            keystore = json.loads(keystore_json)
+            keystore = orjson.loads(keystore_json)
             account = Account.decrypt(keystore, password)
             encrypted_key = self.encrypt_private_key(account.hex())
             return Account.from_key(account).address, encrypted_key
@@ -1,10 +1,17 @@
 """Frontend helper utilities for API integration."""
 
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from datetime import datetime
-from pydantic import BaseModel
+import base64
+import binascii
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
+import orjson
+from pydantic import BaseModel, Field
 from fastapi import HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 
 
 class APIResponse(BaseModel):
@@ -13,7 +20,18 @@ class APIResponse(BaseModel):
     data: Optional[Any] = None
     error: Optional[str] = None
     message: Optional[str] = None
-    timestamp: datetime = datetime.utcnow()
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
 
 def create_response(
@@ -21,57 +39,129 @@ def create_response(
     message: Optional[str] = None,
     error: Optional[str] = None,
     status_code: int = 200,
-) -> JSONResponse:
+) -> Response:
     """Create standardized API response."""
-    response = APIResponse(
-        success=error is None,
-        data=data,
-        error=error,
-        message=message,
-    )
+    payload = {
+        "success": error is None,
+        "data": data,
+        "error": error,
+        "message": message,
+        "timestamp": datetime.utcnow(),
+    }
     
-    return JSONResponse(
-        content=response.dict(),
+    return Response(
+        # Int keys (e.g. per-shard maps) are accepted, as json.dumps did
+        content=orjson.dumps(
+            payload, default=_json_default, option=orjson.OPT_NON_STR_KEYS
+        ),
+        media_type="application/json",
         status_code=status_code,
     )
 
 
 class PaginationParams(BaseModel):
-    """Pagination parameters."""
+    """Pagination parameters.
+
+    When ``cursor`` is set, pagination is keyset-based: callers decode it
+    with ``decode_cursor`` into ``(cursor_key, backward)`` and query
+    ``WHERE (sort_key, id) > cursor_key ORDER BY sort_key, id`` with
+    ``LIMIT page_size + 1`` instead of using ``page`` as an offset. For a
+    backward cursor both the comparison and the ordering are flipped
+    (``< cursor_key ORDER BY sort_key DESC, id DESC``); ``sort_desc`` flips
+    them once more.
+    """
     page: int = 1
     page_size: int = 10
     sort_by: Optional[str] = None
     sort_desc: bool = False
+    cursor: Optional[str] = None
 
 
 class PaginatedResponse(BaseModel):
-    """Paginated response model."""
+    """Paginated response model.
+
+    Used as the endpoint response schema; ``paginate_response`` builds the
+    matching dict directly.
+    """
     items: List[Any]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(key: Tuple, backward: bool = False) -> str:
+    """Encode a keyset position and paging direction as an opaque cursor string."""
+    return base64.urlsafe_b64encode(
+        orjson.dumps({"key": list(key), "backward": backward}, default=_json_default)
+    ).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Tuple, bool]:
+    """Decode a cursor string back into its keyset position and direction."""
+    try:
+        payload = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise create_error_response("Invalid pagination cursor", "VALIDATION_ERROR")
+    if (not isinstance(payload, dict) or not isinstance(payload.get("key"), list)
+            or not isinstance(payload.get("backward"), bool)):
+        raise create_error_response("Invalid pagination cursor", "VALIDATION_ERROR")
+    return tuple(payload["key"]), payload["backward"]
 
 
 def paginate_response(
     items: List[Any],
-    total: int,
+    total: Optional[int],
     params: PaginationParams,
+    sort_key: Optional[Callable[[Any], Tuple]] = None,
 ) -> Dict:
-    """Create paginated response."""
+    """Create paginated response.
+
+    In cursor mode (``params.cursor`` or ``sort_key`` given) ``items`` are
+    the rows in query order, up to ``page_size + 1`` of them; the extra row
+    only signals that another page exists in the query direction. Rows of
+    a backward page are put back into display order. ``sort_key`` maps an
+    item to its keyset position for the returned cursors, and ``total``
+    may be None to skip the COUNT query.
+    """
+    if params.cursor is not None or sort_key is not None:
+        backward = params.cursor is not None and decode_cursor(params.cursor)[1]
+        has_more = len(items) > params.page_size
+        page = items[:params.page_size]
+        if backward:
+            page.reverse()
+        # A backward page was reached from the page after it
+        has_next = backward or has_more
+        has_prev = has_more if backward else params.cursor is not None
+        return {
+            "items": page,
+            "total": total,
+            "page": None,
+            "page_size": params.page_size,
+            "total_pages": None,
+            "has_next": has_next,
+            "has_prev": has_prev,
+            "next_cursor": encode_cursor(sort_key(page[-1])) if has_next and sort_key and page else None,
+            "prev_cursor": encode_cursor(sort_key(page[0]), backward=True) if has_prev and sort_key and page else None,
+        }
+
     total_pages = (total + params.page_size - 1) // params.page_size
     
-    return PaginatedResponse(
-        items=items,
-        total=total,
-        page=params.page,
-        page_size=params.page_size,
-        total_pages=total_pages,
-        has_next=params.page < total_pages,
-        has_prev=params.page > 1,
-    ).dict()
+    return {
+        "items": items,
+        "total": total,
+        "page": params.page,
+        "page_size": params.page_size,
+        "total_pages": total_pages,
+        "has_next": params.page < total_pages,
+        "has_prev": params.page > 1,
+        "next_cursor": None,
+        "prev_cursor": None,
+    }
 
 
 class ErrorDetail(BaseModel):
@@ -107,7 +197,7 @@ class WebSocketMessage(BaseModel):
     """WebSocket message model."""
     type: str
     data: Any
-    timestamp: datetime = datetime.utcnow()
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
 def create_ws_message(
@@ -137,13 +227,17 @@ ERROR_CODES = {
 
 
 # Frontend helper functions
+@lru_cache(maxsize=8192)
+def _truncate_address(address: str) -> str:
+    """Shorten an address to its leading and trailing characters."""
+    return f"{address[:6]}...{address[-4:]}"
+
+
 def format_blockchain_address(address: str, truncate: bool = True) -> str:
     """Format blockchain address for display."""
     if not address:
         return ""
-    if truncate:
-        return f"{address[:6]}...{address[-4:]}"
-    return address
+    return _truncate_address(address) if truncate else address
 
 
 def format_token_amount(
@@ -164,28 +258,38 @@ def format_token_amount(
     return f"{result} ETH" if include_suffix else result
 
 
+DEFAULT_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
 def format_timestamp(
     timestamp: Union[int, datetime],
-    format_str: str = "%Y-%m-%d %H:%M:%S",
+    format_str: str = DEFAULT_TIMESTAMP_FORMAT,
 ) -> str:
     """Format timestamp for display."""
     if isinstance(timestamp, int):
         timestamp = datetime.fromtimestamp(timestamp)
+    if format_str == DEFAULT_TIMESTAMP_FORMAT:
+        return (
+            f"{timestamp.year:04d}-{timestamp.month:02d}-{timestamp.day:02d} "
+            f"{timestamp.hour:02d}:{timestamp.minute:02d}:{timestamp.second:02d}"
+        )
     return timestamp.strftime(format_str)
 
 
+EXPLORER_BASE_URLS = MappingProxyType({
+    "mainnet": "https://etherscan.io",
+    "ropsten": "https://ropsten.etherscan.io",
+    "rinkeby": "https://rinkeby.etherscan.io",
+    "goerli": "https://goerli.etherscan.io",
+})
+DEFAULT_EXPLORER_BASE_URL = EXPLORER_BASE_URLS["mainnet"]
+
+
 def create_explorer_link(
     hash_or_address: str,
     network: str = "mainnet",
     type_: str = "tx",
 ) -> str:
     """Create blockchain explorer link."""
-    base_urls = {
-        "mainnet": "https://etherscan.io",
-        "ropsten": "https://ropsten.etherscan.io",
-        "rinkeby": "https://rinkeby.etherscan.io",
-        "goerli": "https://goerli.etherscan.io",
-    }
-    
-    base_url = base_urls.get(network, base_urls["mainnet"])
-    return f"{base_url}/{type_}/{hash_or_address}" 
\ No newline at end of file
+    base_url = EXPLORER_BASE_URLS.get(network, DEFAULT_EXPLORER_BASE_URL)
+    return f"{base_url}/{type_}/{hash_or_address}"
@@ -1,13 +1,37 @@
 """Models for authentication system."""
 
+import calendar
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Optional, List, Dict, Set
-from enum import Enum
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict
+from enum import Enum, IntFlag
 import secrets
 import pyotp
 import json
+import orjson
 from web3.types import ChecksumAddress
+from src.utils.crypto import get_totp
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_ns(value: datetime) -> int:
+    """Convert a naive UTC datetime to nanoseconds since the epoch."""
+    return calendar.timegm(value.timetuple()) * 1_000_000_000 + value.microsecond * 1000
+
+
+def _from_ns(value: int) -> datetime:
+    """Convert nanoseconds since the epoch to a naive UTC datetime."""
+    return _EPOCH + timedelta(microseconds=value // 1000)
+
+
+def _enum_default(obj):
+    """Serialize enums by value for orjson."""
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
 
 class AuthMethod(Enum):
@@ -19,12 +43,21 @@ class AuthMethod(Enum):
     SSO = "sso"
 
 
-class UserRole(Enum):
+class UserRole(IntFlag):
     """User roles for role-based access control."""
-    ADMIN = "admin"
-    OPERATOR = "operator"
-    USER = "user"
-    AUDITOR = "auditor"
+    ADMIN = 1
+    OPERATOR = 2
+    USER = 4
+    AUDITOR = 8
+
+
+# Roles granting each permission
+PERMISSION_MAP = {
+    "admin": UserRole.ADMIN,
+    "operate": UserRole.ADMIN | UserRole.OPERATOR,
+    "audit": UserRole.ADMIN | UserRole.AUDITOR,
+    "transact": UserRole.ADMIN | UserRole.OPERATOR | UserRole.USER,
+}
 
 
 class WalletType(Enum):
@@ -34,7 +67,7 @@ class WalletType(Enum):
     MULTISIG = "multisig"
 
 
-@dataclass
+@dataclass(slots=True)
 class SecuritySettings:
     """Security settings for user account."""
     ip_whitelist: List[str] = field(default_factory=list)
@@ -47,7 +80,7 @@ class SecuritySettings:
     require_email_verification: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class WalletConfig:
     """Wallet configuration for user."""
     address: ChecksumAddress
@@ -60,24 +93,24 @@ class WalletConfig:
     label: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AuditLog:
     """Audit log entry."""
-    id: str = field(default_factory=lambda: secrets.token_hex(16))
-    timestamp: datetime = field(default_factory=datetime.utcnow)
     user_id: str
     action: str
     status: str
+    id: str = field(default_factory=lambda: secrets.token_urlsafe(12))
+    timestamp: datetime = field(default_factory=datetime.utcnow)
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
     details: Dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     """User model for authentication."""
-    id: str = field(default_factory=lambda: secrets.token_hex(16))
     email: str
+    id: str = field(default_factory=lambda: secrets.token_hex(16))
     password_hash: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
@@ -87,14 +120,36 @@ class User:
     is_active: bool = True
     last_login: Optional[datetime] = None
     failed_login_attempts: int = 0
-    locked_until: Optional[datetime] = None
-    roles: Set[UserRole] = field(default_factory=lambda: {UserRole.USER})
+    # Lockout deadline in nanoseconds since the epoch, 0 when not locked
+    locked_until_ns: int = 0
+    roles: UserRole = UserRole.USER
     security_settings: SecuritySettings = field(default_factory=SecuritySettings)
-    wallets: List[WalletConfig] = field(default_factory=list)
+    wallets: Dict[ChecksumAddress, WalletConfig] = field(default_factory=dict)
     oauth_providers: Dict[str, Dict] = field(default_factory=dict)
     sso_config: Optional[Dict] = None
     webauthn_credentials: List[Dict] = field(default_factory=list)
-    session_fingerprints: List[str] = field(default_factory=list)
+    session_fingerprints: "OrderedDict[str, None]" = field(default_factory=OrderedDict)
+    
+    @property
+    def locked_until(self) -> Optional[datetime]:
+        """Lockout deadline as a naive UTC datetime, if locked."""
+        return _from_ns(self.locked_until_ns) if self.locked_until_ns else None
+    
+    @locked_until.setter
+    def locked_until(self, value: Optional[datetime]) -> None:
+        self.locked_until_ns = _to_ns(value) if value else 0
+    
+    def is_locked(self) -> bool:
+        """Check if account is locked out."""
+        return time.time_ns() < self.locked_until_ns
+    
+    def lock(self, duration: int) -> None:
+        """Lock account for duration seconds."""
+        self.locked_until_ns = time.time_ns() + duration * 1_000_000_000
+    
+    def unlock(self) -> None:
+        """Clear account lockout."""
+        self.locked_until_ns = 0
     
     def enable_2fa(self) -> str:
         """Enable 2FA for user and return secret."""
@@ -108,17 +163,16 @@ class User:
         """Verify 2FA code."""
         if not self.two_factor_enabled or not self.two_factor_secret:
             return False
-        totp = pyotp.TOTP(self.two_factor_secret)
-        return totp.verify(code)
+        return get_totp(self.two_factor_secret).verify(code)
     
     def add_wallet(self, wallet: WalletConfig) -> None:
         """Add wallet configuration."""
-        self.wallets.append(wallet)
+        self.wallets[wallet.address] = wallet
         self.updated_at = datetime.utcnow()
     
     def remove_wallet(self, address: ChecksumAddress) -> None:
         """Remove wallet configuration."""
-        self.wallets = [w for w in self.wallets if w.address != address]
+        self.wallets.pop(address, None)
         self.updated_at = datetime.utcnow()
     
     def add_webauthn_credential(self, credential: Dict) -> None:
@@ -132,20 +186,16 @@ class User:
     
     def add_session_fingerprint(self, fingerprint: str) -> None:
         """Add session fingerprint."""
+        if fingerprint in self.session_fingerprints:
+            self.session_fingerprints.move_to_end(fingerprint)
+            return
         if len(self.session_fingerprints) >= self.security_settings.max_devices:
-            self.session_fingerprints.pop(0)
-        self.session_fingerprints.append(fingerprint)
+            self.session_fingerprints.popitem(last=False)
+        self.session_fingerprints[fingerprint] = None
     
     def has_permission(self, permission: str) -> bool:
         """Check if user has specific permission."""
-        permission_map = {
-            "admin": {UserRole.ADMIN},
-            "operate": {UserRole.ADMIN, UserRole.OPERATOR},
-            "audit": {UserRole.ADMIN, UserRole.AUDITOR},
-            "transact": {UserRole.ADMIN, UserRole.OPERATOR, UserRole.USER}
-        }
-        required_roles = permission_map.get(permission, set())
-        return bool(required_roles & self.roles)
+        return bool(PERMISSION_MAP.get(permission, 0) & self.roles)
     
     def to_dict(self) -> Dict:
         """Convert user to dictionary."""
@@ -153,7 +203,7 @@ class User:
             "id": self.id,
             "email": self.email,
             "is_active": self.is_active,
-            "roles": [role.value for role in self.roles],
+            "roles": [role.name.lower() for role in UserRole if role & self.roles],
             "two_factor_enabled": self.two_factor_enabled,
             "wallets": [
                 {
@@ -161,7 +211,7 @@ class User:
                     "type": w.wallet_type.value,
                     "label": w.label
                 }
-                for w in self.wallets
+                for w in self.wallets.values()
             ],
             "security_settings": {
                 "ip_whitelist": self.security_settings.ip_whitelist,
@@ -170,16 +220,21 @@ class User:
                 "transaction_limit_daily": self.security_settings.transaction_limit_daily
             }
         }
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize user to JSON bytes."""
+        return orjson.dumps(self.to_dict(), default=_enum_default)
 
 
-@dataclass
+@dataclass(slots=True)
 class Session:
     """Session model for user authentication."""
-    id: str = field(default_factory=lambda: secrets.token_hex(32))
     user_id: str
-    token: str = field(default_factory=lambda: secrets.token_hex(64))
+    # Expiry deadline in nanoseconds since the epoch
+    expires_ns: int
+    id: str = field(default_factory=lambda: secrets.token_urlsafe(32))
+    token: str = field(default_factory=lambda: secrets.token_urlsafe(48))
     created_at: datetime = field(default_factory=datetime.utcnow)
-    expires_at: datetime
     is_active: bool = True
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
@@ -189,9 +244,18 @@ class Session:
     device_info: Dict = field(default_factory=dict)
     geo_location: Optional[Dict] = None
     
+    @property
+    def expires_at(self) -> datetime:
+        """Expiry deadline as a naive UTC datetime."""
+        return _from_ns(self.expires_ns)
+    
+    @expires_at.setter
+    def expires_at(self, value: datetime) -> None:
+        self.expires_ns = _to_ns(value)
+    
     def is_expired(self) -> bool:
         """Check if session is expired."""
-        return datetime.utcnow() > self.expires_at
+        return time.time_ns() > self.expires_ns
     
     def update_activity(self) -> None:
         """Update last activity timestamp."""
@@ -208,4 +272,8 @@ class Session:
             "auth_method": self.auth_method.value,
             "device_info": self.device_info,
             "geo_location": self.geo_location
-        } 
\ No newline at end of file
+        }
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize session to JSON bytes."""
+        return orjson.dumps(self.to_dict(), default=_enum_default)
@@ -1,14 +1,20 @@
 """Authentication service for managing users and sessions."""
 
+import asyncio
 import bcrypt
 import jwt
+import re
 import secrets
-from datetime import datetime, timedelta
+import time
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from datetime import date, datetime, timedelta
+from functools import lru_cache, reduce
+from operator import or_
 from typing import Optional, Dict, List, Tuple
 import logging
 from eth_account import Account
-from eth_account.messages import encode_defunct
-from web3 import Web3
+from eth_account.messages import SignableMessage, encode_defunct
 from web3.types import ChecksumAddress
 import geoip2.database
 import user_agents
@@ -36,9 +42,39 @@ from .models import (
     SecuritySettings,
     AuditLog,
 )
+from .utils import (
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+    ARGON2_TIME_COST,
+    create_session_token,
+    verify_token,
+)
 
 logger = logging.getLogger(__name__)
 
+# User agents not worth parsing into device details
+MAX_USER_AGENT_LENGTH = 512
+BOT_USER_AGENT_RE = re.compile(r"(?i)bot|spider|crawl|curl|wget")
+
+# WebAuthn registration options shared by every user
+WEBAUTHN_SELECTION = AuthenticatorSelectionCriteria(
+    user_verification=UserVerificationRequirement.PREFERRED,
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_user_agent(user_agent_string: str) -> Tuple[str, str, str]:
+    """Parse a user agent string into browser, OS and device families."""
+    ua = user_agents.parse(user_agent_string)
+    return ua.browser.family, ua.os.family, ua.device.family
+
+
+@lru_cache(maxsize=2)
+def _login_message(day: date) -> SignableMessage:
+    """Build the signable wallet login challenge for a given day."""
+    return encode_defunct(text=f"Login to service at {day}")
+
+
 class AuthService:
     """Service for handling user authentication and management."""
     
@@ -53,6 +89,7 @@ class AuthService:
     ):
         """Initialize auth service."""
         self.jwt_secret = jwt_secret
+        self._jwt_key = jwt_secret.encode()
         self.fernet = Fernet(encryption_key.encode())
         self.session_duration = session_duration
         self.max_failed_attempts = max_failed_attempts
@@ -60,7 +97,23 @@ class AuthService:
         self.geoip_reader = (
             geoip2.database.Reader(geoip_db_path) if geoip_db_path else None
         )
-        self.web3 = Web3()
+        self._geo_lookup = lru_cache(maxsize=65536)(self._lookup_geo_location)
+        
+        # WebAuthn relying party
+        self.rp_id = "yourdomain.com"
+        self.rp_name = "Your Service"
+        self.rp_origin = f"https://{self.rp_id}"
+        
+        # Audit logs are queued and written in batches by a background task
+        self.audit_batch_size = 1000
+        self.audit_flush_interval = 0.1  # seconds
+        self._audit_queue: asyncio.Queue = asyncio.Queue(maxsize=10000)
+        self._audit_flusher_task: Optional[asyncio.Task] = None
+        self.password_hasher = PasswordHasher(
+            time_cost=ARGON2_TIME_COST,
+            memory_cost=ARGON2_MEMORY_COST,
+            parallelism=ARGON2_PARALLELISM,
+        )
         
     async def register_user(
         self,
@@ -73,12 +126,12 @@ class AuthService:
         """Register a new user."""
         user = User(
             email=email,
-            roles=set(roles) if roles else {UserRole.USER},
+            roles=reduce(or_, roles) if roles else UserRole.USER,
             security_settings=security_settings or SecuritySettings(),
         )
         
         if auth_method == AuthMethod.PASSWORD and password:
-            user.password_hash = self._hash_password(password)
+            user.password_hash = await self._hash_password(password)
         
         await self._create_audit_log(
             user.id,
@@ -102,7 +155,7 @@ class AuthService:
         if not user or not user.is_active:
             return None, None
             
-        if user.locked_until and user.locked_until > datetime.utcnow():
+        if user.is_locked():
             await self._create_audit_log(
                 user.id,
                 "authentication_attempt",
@@ -115,7 +168,7 @@ class AuthService:
         auth_method = None
         
         if password and AuthMethod.PASSWORD in user.security_settings.allowed_auth_methods:
-            auth_success = self._verify_password(password, user.password_hash)
+            auth_success = await self._verify_password(user, password)
             auth_method = AuthMethod.PASSWORD
             
         elif wallet_signature and AuthMethod.HARDWARE_WALLET in user.security_settings.allowed_auth_methods:
@@ -129,7 +182,7 @@ class AuthService:
         if not auth_success:
             user.failed_login_attempts += 1
             if user.failed_login_attempts >= self.max_failed_attempts:
-                user.locked_until = datetime.utcnow() + timedelta(seconds=self.lockout_duration)
+                user.lock(self.lockout_duration)
             await self._create_audit_log(
                 user.id,
                 "authentication_attempt",
@@ -140,7 +193,7 @@ class AuthService:
             
         # Reset failed attempts on successful login
         user.failed_login_attempts = 0
-        user.locked_until = None
+        user.unlock()
         user.last_login = datetime.utcnow()
         
         # Create session with enhanced security
@@ -192,6 +245,21 @@ class AuthService:
         session.update_activity()
         return session
     
+    def issue_session_token(self, user: User) -> str:
+        """Issue a signed JWT session token for a user."""
+        return create_session_token(
+            user.id,
+            self._jwt_key,
+            timedelta(seconds=self.session_duration),
+        )
+    
+    def verify_session_token(self, token: str) -> Optional[Dict]:
+        """Verify a JWT session token and return its payload.
+        
+        Decoded payloads are cached by verify_token until they expire.
+        """
+        return verify_token(token, self._jwt_key, "session")
+    
     async def add_hardware_wallet(
         self,
         user: User,
@@ -219,13 +287,11 @@ class AuthService:
     async def setup_webauthn(self, user: User) -> Dict:
         """Set up WebAuthn for user."""
         options = generate_registration_options(
-            rp_id="yourdomain.com",
-            rp_name="Your Service",
+            rp_id=self.rp_id,
+            rp_name=self.rp_name,
             user_id=user.id,
             user_name=user.email,
-            authenticator_selection=AuthenticatorSelectionCriteria(
-                user_verification=UserVerificationRequirement.PREFERRED,
-            ),
+            authenticator_selection=WEBAUTHN_SELECTION,
             attestation=AttestationConveyancePreference.DIRECT,
         )
         return options
@@ -240,8 +306,8 @@ class AuthService:
             credential = verify_registration_response(
                 credential=response,
                 expected_challenge=response["challenge"],
-                expected_origin="https://yourdomain.com",
-                expected_rp_id="yourdomain.com",
+                expected_origin=self.rp_origin,
+                expected_rp_id=self.rp_id,
             )
             user.add_webauthn_credential(credential.json())
             await self._create_audit_log(
@@ -261,21 +327,50 @@ class AuthService:
             )
         return False
         
-    def _hash_password(self, password: str) -> str:
-        """Hash password using bcrypt."""
-        return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    async def _hash_password(self, password: str) -> str:
+        """Hash password using argon2id."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.password_hasher.hash, password)
     
-    def _verify_password(self, password: str, password_hash: str) -> bool:
-        """Verify password against hash."""
-        return bcrypt.checkpw(password.encode(), password_hash.encode())
+    async def _verify_password(self, user: User, password: str) -> bool:
+        """Verify password against the user's hash.
+        
+        Legacy bcrypt hashes are upgraded to argon2id on successful login.
+        """
+        password_hash = user.password_hash
+        if not password_hash:
+            return False
+        
+        loop = asyncio.get_running_loop()
+        if password_hash.startswith("$argon2"):
+            try:
+                await loop.run_in_executor(
+                    None, self.password_hasher.verify, password_hash, password
+                )
+            except (VerificationError, InvalidHashError):
+                return False
+            if self.password_hasher.check_needs_rehash(password_hash):
+                await self._rehash_password(user, password)
+            return True
+        
+        valid = await loop.run_in_executor(
+            None, bcrypt.checkpw, password.encode(), password_hash.encode()
+        )
+        if valid:
+            await self._rehash_password(user, password)
+        return valid
+    
+    async def _rehash_password(self, user: User, password: str) -> None:
+        """Replace the user's password hash with a current argon2id hash."""
+        user.password_hash = await self._hash_password(password)
+        await self._save_user(user)
     
     def _verify_wallet_signature(self, user: User, signature: str) -> bool:
         """Verify wallet signature."""
         try:
-            message = f"Login to service at {datetime.utcnow().date()}"
-            message_hash = encode_defunct(text=message)
+            message_hash = _login_message(datetime.utcnow().date())
             address = Account.recover_message(message_hash, signature=signature)
-            return any(w.address == address for w in user.wallets)
+            return address in user.wallets
         except Exception as e:
             logger.error(f"Wallet signature verification failed: {str(e)}")
             return False
@@ -288,36 +383,40 @@ class AuthService:
         user_agent_string: Optional[str] = None,
     ) -> Session:
         """Create new session with enhanced security."""
-        expires_at = datetime.utcnow() + timedelta(seconds=self.session_duration)
-        fingerprint = secrets.token_hex(32)
+        expires_ns = time.time_ns() + self.session_duration * 1_000_000_000
+        fingerprint = secrets.token_urlsafe(32)
         
         # Parse user agent
         device_info = {}
-        if user_agent_string:
-            ua = user_agents.parse(user_agent_string)
+        if user_agent_string and (
+            len(user_agent_string) > MAX_USER_AGENT_LENGTH
+            or BOT_USER_AGENT_RE.search(user_agent_string)
+        ):
+            device_info = {"browser": "unknown"}
+        elif user_agent_string:
+            browser, os_family, device = _parse_user_agent(user_agent_string)
             device_info = {
-                "browser": ua.browser.family,
-                "os": ua.os.family,
-                "device": ua.device.family,
+                "browser": browser,
+                "os": os_family,
+                "device": device,
             }
         
         # Get geolocation
         geo_location = None
         if ip_address and self.geoip_reader:
-            try:
-                response = self.geoip_reader.city(ip_address)
+            location = self._geo_lookup(ip_address)
+            if location:
+                country, city, latitude, longitude = location
                 geo_location = {
-                    "country": response.country.name,
-                    "city": response.city.name,
-                    "latitude": response.location.latitude,
-                    "longitude": response.location.longitude,
+                    "country": country,
+                    "city": city,
+                    "latitude": latitude,
+                    "longitude": longitude,
                 }
-            except Exception as e:
-                logger.error(f"Geolocation lookup failed: {str(e)}")
         
         session = Session(
             user_id=user.id,
-            expires_at=expires_at,
+            expires_ns=expires_ns,
             ip_address=ip_address,
             user_agent=user_agent_string,
             fingerprint=fingerprint,
@@ -329,6 +428,23 @@ class AuthService:
         user.add_session_fingerprint(fingerprint)
         return session
     
+    def _lookup_geo_location(
+        self,
+        ip_address: str,
+    ) -> Optional[Tuple[Optional[str], Optional[str], Optional[float], Optional[float]]]:
+        """Look up country, city and coordinates for an IP address."""
+        try:
+            response = self.geoip_reader.city(ip_address)
+        except Exception as e:
+            logger.error(f"Geolocation lookup failed: {str(e)}")
+            return None
+        return (
+            response.country.name,
+            response.city.name,
+            response.location.latitude,
+            response.location.longitude,
+        )
+    
     async def _create_audit_log(
         self,
         user_id: str,
@@ -336,21 +452,85 @@ class AuthService:
         status: str,
         details: Dict = None,
     ) -> None:
-        """Create audit log entry."""
+        """Queue audit log entry for batched writing."""
         audit_log = AuditLog(
             user_id=user_id,
             action=action,
             status=status,
             details=details or {},
         )
-        # Save audit log to database
-        logger.info(f"Audit log created: {audit_log}")
+        if self._audit_flusher_task is None or self._audit_flusher_task.done():
+            self._audit_flusher_task = asyncio.create_task(self._audit_flusher())
+            
+        # Never block the auth path: when the queue is full, drop the oldest
+        # entry, logging it so the record is not lost silently
+        try:
+            self._audit_queue.put_nowait(audit_log)
+        except asyncio.QueueFull:
+            dropped = self._audit_queue.get_nowait()
+            logger.warning(f"Audit queue full, dropped oldest entry: {dropped}")
+            self._audit_queue.put_nowait(audit_log)
+    
+    async def _audit_flusher(self) -> None:
+        """Drain the audit queue, writing up to one batch per flush interval."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await self._audit_queue.get())
+                deadline = loop.time() + self.audit_flush_interval
+                while len(batch) < self.audit_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._audit_queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            finally:
+                # Also runs on cancellation, so entries already taken are not lost
+                if batch:
+                    self._write_audit_logs(batch)
+    
+    async def flush_audit_logs(self) -> None:
+        """Write all queued audit log entries immediately."""
+        batch = []
+        while not self._audit_queue.empty():
+            batch.append(self._audit_queue.get_nowait())
+        if batch:
+            self._write_audit_logs(batch)
+    
+    async def close(self) -> None:
+        """Stop the audit flusher and write any pending entries."""
+        if self._audit_flusher_task is not None:
+            self._audit_flusher_task.cancel()
+            try:
+                await self._audit_flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._audit_flusher_task = None
+        await self.flush_audit_logs()
+    
+    def _write_audit_logs(self, batch: List[AuditLog]) -> None:
+        """Persist a batch of audit log entries."""
+        try:
+            # One log line per entry; a database backend would write the
+            # whole batch with a single multi-row insert here
+            for audit_log in batch:
+                logger.info(f"Audit log created: {audit_log}")
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} audit log entries: {str(e)}")
     
     async def _get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email from database."""
         # Implementation depends on your database
         pass
     
+    async def _save_user(self, user: User) -> None:
+        """Save user to database."""
+        # Implementation depends on your database
+        pass
+    
     async def _get_session(self, session_id: str) -> Optional[Session]:
         """Get session from database."""
         # Implementation depends on your database
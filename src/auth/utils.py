@@ -4,56 +4,183 @@ import secrets
 import hashlib
 import hmac
 import base64
+import itertools
 import json
-from typing import Dict, Optional, Tuple, List
+import threading
+import time
+from functools import cached_property
+from typing import Dict, FrozenSet, Optional, Tuple, List, Union
 import jwt
+import orjson
+from argon2.low_level import Type, hash_secret_raw
+from cachetools import LRUCache, TTLCache
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from eth_account import Account
 from eth_account.messages import encode_defunct
+from eth_keys import keys
+from eth_utils import keccak, to_bytes
 from web3.types import ChecksumAddress
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+# Verified (payload, exp) pairs, keyed by a digest of the token
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_CACHE_TTL = 5  # seconds
+_token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+_token_cache_lock = threading.Lock()
+
+
+def _token_cache_key(token: str, secret_key: Union[str, bytes, None] = None) -> bytes:
+    """Digest a token (and the key it was verified with) for cache lookups."""
+    h = hashlib.blake2b(digest_size=16)
+    if secret_key is not None:
+        h.update(secret_key.encode() if isinstance(secret_key, str) else secret_key)
+        h.update(b"\x00")
+    h.update(token.encode())
+    return h.digest()
+
+
+def _cached_payload(cache: TTLCache, lock: threading.Lock, key: bytes) -> Optional[Dict]:
+    """Get a cached payload that has not expired yet."""
+    with lock:
+        entry = cache.get(key)
+    if entry is None or entry[1] <= time.time():
+        return None
+    return dict(entry[0])
+
+
+def _cache_payload(cache: TTLCache, lock: threading.Lock, key: bytes, payload: Dict) -> None:
+    """Cache a verified payload along with its expiry."""
+    entry = (payload, payload.get("exp", float("inf")))
+    with lock:
+        cache[key] = entry
+
+
+# Keyed HMAC-SHA256 states for API secrets, keyed by a digest of the secret
+HMAC_CACHE_SIZE = 1024
+_hmac_cache = LRUCache(maxsize=HMAC_CACHE_SIZE)
+_hmac_cache_lock = threading.Lock()
+
+
+def _api_secret_cache_key(secret: str) -> bytes:
+    """Digest an API secret for HMAC cache lookups."""
+    return hashlib.blake2b(secret.encode(), digest_size=16).digest()
+
+
+def _hmac_prototype(secret: str) -> "hmac.HMAC":
+    """Get an HMAC-SHA256 keyed with secret, ready to be copied."""
+    key = _api_secret_cache_key(secret)
+    with _hmac_cache_lock:
+        mac = _hmac_cache.get(key)
+    if mac is None:
+        mac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+        with _hmac_cache_lock:
+            _hmac_cache[key] = mac
+    return mac
+
+
+def evict_api_secret(secret: str) -> None:
+    """Drop the cached HMAC state for a revoked API secret."""
+    with _hmac_cache_lock:
+        _hmac_cache.pop(_api_secret_cache_key(secret), None)
+
+
+def _eip191_hash(message: str, include_prefix: bool = True) -> bytes:
+    """Hash a message the way encode_defunct + sign_message does."""
+    data = message.encode() if include_prefix else to_bytes(hexstr=message)
+    return keccak(b"\x19Ethereum Signed Message:\n" + str(len(data)).encode() + data)
+
+
+def _derive_key(
+    password: bytes,
+    salt: bytes,
+    iterations: int = 100_000,
+    length: int = 32
+) -> bytes:
+    """Derive a key with PBKDF2-HMAC-SHA256."""
+    return hashlib.pbkdf2_hmac("sha256", password, salt, iterations, length)
+
+
+# Argon2id costs shared by password hashing and private key encryption
+ARGON2_TIME_COST = 2
+ARGON2_MEMORY_COST = 65536  # KiB
+ARGON2_PARALLELISM = 1
+
+
+def _derive_key_argon2(
+    password: bytes,
+    salt: bytes,
+    time_cost: int = ARGON2_TIME_COST,
+    memory_cost: int = ARGON2_MEMORY_COST,
+    parallelism: int = ARGON2_PARALLELISM,
+    length: int = 32
+) -> bytes:
+    """Derive a key with Argon2id."""
+    return hash_secret_raw(
+        password,
+        salt,
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+        hash_len=length,
+        type=Type.ID,
+    )
+
+
 class SecurityUtils:
     """Utility class for security operations."""
     
     def __init__(self, master_key: str):
         """Initialize security utils."""
         self.master_key = master_key.encode()
+        self._token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+        self._token_cache_lock = threading.Lock()
         self._setup_encryption()
     
     def _setup_encryption(self) -> None:
         """Set up encryption keys."""
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=b"static_salt",  # In production, use a proper salt management
-            iterations=100000,
-        )
-        self.derived_key = kdf.derive(self.master_key)
-        self.fernet = Fernet(base64.urlsafe_b64encode(self.derived_key))
+        # In production, use a proper salt management
+        self.derived_key = _derive_key(self.master_key, b"static_salt")
+        self._aead = AESGCM(self.derived_key)
+        # 96-bit nonces: random per-process prefix + 64-bit counter
+        self._nonce_prefix = secrets.token_bytes(4)
+        self._nonce_counter = itertools.count(secrets.randbits(64))
+    
+    @cached_property
+    def fernet(self) -> Fernet:
+        """Legacy Fernet cipher for data encrypted before AES-GCM."""
+        return Fernet(base64.urlsafe_b64encode(self.derived_key))
+    
+    def _next_nonce(self) -> bytes:
+        """Get a unique nonce for sensitive data encryption."""
+        counter = next(self._nonce_counter) & 0xFFFFFFFFFFFFFFFF
+        return self._nonce_prefix + counter.to_bytes(8, "big")
     
     def generate_token(self, data: Dict, expiry: int = 3600) -> str:
         """Generate JWT token with enhanced security."""
-        now = datetime.utcnow()
+        now = int(time.time())
         payload = {
             **data,
             "iat": now,
-            "exp": now + timedelta(seconds=expiry),
+            "exp": now + expiry,
             "jti": secrets.token_hex(16)
         }
         return jwt.encode(payload, self.master_key, algorithm="HS512")
     
     def verify_token(self, token: str) -> Tuple[bool, Optional[Dict]]:
         """Verify JWT token with enhanced security."""
+        key = _token_cache_key(token)
+        payload = _cached_payload(self._token_cache, self._token_cache_lock, key)
+        if payload is not None:
+            return True, payload
         try:
             payload = jwt.decode(token, self.master_key, algorithms=["HS512"])
-            return True, payload
+            _cache_payload(self._token_cache, self._token_cache_lock, key, payload)
+            return True, dict(payload)
         except jwt.InvalidTokenError as e:
             logger.warning(f"Token verification failed: {str(e)}")
             return False, None
@@ -64,13 +191,7 @@ class SecurityUtils:
         salt = secrets.token_bytes(16)
         
         # Derive key from password
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = kdf.derive(password.encode())
+        key = _derive_key_argon2(password.encode(), salt)
         
         # Generate nonce
         nonce = secrets.token_bytes(12)
@@ -86,6 +207,12 @@ class SecurityUtils:
         )
         
         return {
+            "kdf": "argon2id",
+            "kdfparams": {
+                "t": ARGON2_TIME_COST,
+                "m": ARGON2_MEMORY_COST,
+                "p": ARGON2_PARALLELISM
+            },
             "salt": base64.b64encode(salt).decode(),
             "nonce": base64.b64encode(nonce).decode(),
             "ciphertext": base64.b64encode(ciphertext).decode()
@@ -99,14 +226,19 @@ class SecurityUtils:
             nonce = base64.b64decode(encrypted_data["nonce"])
             ciphertext = base64.b64decode(encrypted_data["ciphertext"])
             
-            # Derive key from password
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=100000,
-            )
-            key = kdf.derive(password.encode())
+            # Derive key from password with the costs it was encrypted with;
+            # blobs without a kdf tag used PBKDF2
+            if encrypted_data.get("kdf") == "argon2id":
+                params = encrypted_data["kdfparams"]
+                key = _derive_key_argon2(
+                    password.encode(),
+                    salt,
+                    time_cost=params["t"],
+                    memory_cost=params["m"],
+                    parallelism=params["p"]
+                )
+            else:
+                key = _derive_key(password.encode(), salt)
             
             # Create AESGCM cipher
             aesgcm = AESGCM(key)
@@ -166,6 +298,59 @@ class SecurityUtils:
             logger.error(f"Signature verification failed: {str(e)}")
             return False
     
+    def sign_messages(
+        self,
+        messages: List[str],
+        private_key: str,
+        include_prefix: bool = True
+    ) -> List[str]:
+        """Sign several messages with one private key."""
+        key = keys.PrivateKey(to_bytes(hexstr=private_key))
+        signatures = []
+        for message in messages:
+            signature = key.sign_msg_hash(_eip191_hash(message, include_prefix))
+            signatures.append(
+                "0x" + (signature.r.to_bytes(32, "big")
+                        + signature.s.to_bytes(32, "big")
+                        + bytes([signature.v + 27])).hex()
+            )
+        return signatures
+    
+    def verify_signatures(
+        self,
+        messages: List[str],
+        signatures: List[str],
+        expected_address: ChecksumAddress,
+        include_prefix: bool = True
+    ) -> List[bool]:
+        """Verify several message signatures against one address.
+        
+        Every message fails verification if the number of signatures does
+        not match the number of messages.
+        """
+        if len(messages) != len(signatures):
+            logger.error(
+                f"Signature verification failed: {len(messages)} messages, "
+                f"{len(signatures)} signatures"
+            )
+            return [False] * len(messages)
+        expected = expected_address.lower()
+        results = []
+        for message, signature in zip(messages, signatures):
+            try:
+                raw = to_bytes(hexstr=signature)
+                v = raw[64] - 27 if raw[64] >= 27 else raw[64]
+                public_key = keys.Signature(vrs=(
+                    v,
+                    int.from_bytes(raw[:32], "big"),
+                    int.from_bytes(raw[32:64], "big")
+                )).recover_public_key_from_msg_hash(_eip191_hash(message, include_prefix))
+                results.append(public_key.to_checksum_address().lower() == expected)
+            except Exception as e:
+                logger.error(f"Signature verification failed: {str(e)}")
+                results.append(False)
+        return results
+    
     def generate_session_id(self) -> str:
         """Generate secure session ID."""
         return secrets.token_urlsafe(32)
@@ -187,31 +372,41 @@ class SecurityUtils:
         """Verify API request signature."""
         try:
             message = f"{api_key}{timestamp}{payload}"
-            expected_signature = hmac.new(
-                api_secret.encode(),
-                message.encode(),
-                hashlib.sha256
-            ).hexdigest()
+            mac = _hmac_prototype(api_secret).copy()
+            mac.update(message.encode())
+            expected_signature = mac.hexdigest()
             return hmac.compare_digest(signature, expected_signature)
         except Exception as e:
             logger.error(f"API signature verification failed: {str(e)}")
             return False
     
+    def revoke_api_secret(self, api_secret: str) -> None:
+        """Forget cached signing state for a revoked API secret."""
+        evict_api_secret(api_secret)
+    
     def generate_backup_codes(self, count: int = 8) -> List[str]:
         """Generate backup recovery codes."""
-        return [secrets.token_hex(4).upper() for _ in range(count)]
+        raw = secrets.token_bytes(count * 4)
+        return [raw[i:i + 4].hex().upper() for i in range(0, count * 4, 4)]
     
-    def hash_backup_codes(self, codes: List[str]) -> List[str]:
-        """Hash backup recovery codes for storage."""
-        return [
-            hashlib.sha256(code.encode()).hexdigest()
-            for code in codes
-        ]
+    def hash_backup_codes(self, codes: List[str]) -> FrozenSet[bytes]:
+        """Hash backup recovery codes for storage.
+        
+        The raw SHA-256 digests are returned as a frozenset, built once here
+        and passed as is to verify_backup_code.
+        """
+        sha256 = hashlib.sha256
+        return frozenset(sha256(code.encode()).digest() for code in codes)
     
-    def verify_backup_code(self, code: str, hashed_codes: List[str]) -> bool:
-        """Verify backup recovery code."""
-        code_hash = hashlib.sha256(code.encode()).hexdigest()
-        return code_hash in hashed_codes
+    def verify_backup_code(self, code: str, hashed_codes: FrozenSet[bytes]) -> bool:
+        """Verify backup recovery code against hashes from hash_backup_codes."""
+        code_hash = hashlib.sha256(code.encode()).digest()
+        # Compare against every stored hash, so timing reveals neither
+        # whether the code matched nor which slot it matched
+        matched = False
+        for hashed_code in hashed_codes:
+            matched |= hmac.compare_digest(code_hash, hashed_code)
+        return matched
     
     def generate_device_fingerprint(
         self,
@@ -225,17 +420,23 @@ class SecurityUtils:
             "ip_address": ip_address,
             **(additional_data or {})
         }
-        fingerprint_data = json.dumps(data, sort_keys=True)
-        return hashlib.sha256(fingerprint_data.encode()).hexdigest()
+        return hashlib.sha256(orjson.dumps(data, option=orjson.OPT_SORT_KEYS)).hexdigest()
     
     def encrypt_sensitive_data(self, data: Dict) -> str:
         """Encrypt sensitive data."""
-        return self.fernet.encrypt(json.dumps(data).encode()).decode()
+        nonce = self._next_nonce()
+        ciphertext = self._aead.encrypt(nonce, json.dumps(data).encode(), None)
+        return base64.b64encode(nonce + ciphertext).decode()
     
     def decrypt_sensitive_data(self, encrypted_data: str) -> Optional[Dict]:
         """Decrypt sensitive data."""
         try:
-            decrypted = self.fernet.decrypt(encrypted_data.encode())
+            try:
+                raw = base64.b64decode(encrypted_data, validate=True)
+                decrypted = self._aead.decrypt(raw[:12], raw[12:], None)
+            except (ValueError, InvalidTag):
+                # Data encrypted before the switch to AES-GCM
+                decrypted = self.fernet.decrypt(encrypted_data.encode())
             return json.loads(decrypted)
         except Exception as e:
             logger.error(f"Data decryption failed: {str(e)}")
@@ -254,7 +455,7 @@ def generate_token(length: int = 32) -> str:
     return secrets.token_urlsafe(length)
 
 
-def verify_token(token: str, secret_key: str, purpose: str) -> Optional[dict]:
+def verify_token(token: str, secret_key: Union[str, bytes], purpose: str) -> Optional[dict]:
     """
     Verify JWT token.
     
@@ -266,13 +467,18 @@ def verify_token(token: str, secret_key: str, purpose: str) -> Optional[dict]:
     Returns:
         Optional[dict]: Token payload if valid
     """
-    try:
-        payload = jwt.decode(token, secret_key, algorithms=['HS256'])
-        if payload.get('purpose') != purpose:
+    key = _token_cache_key(token, secret_key)
+    payload = _cached_payload(_token_cache, _token_cache_lock, key)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, secret_key, algorithms=['HS256'])
+        except jwt.InvalidTokenError:
             return None
-        return payload
-    except jwt.InvalidTokenError:
+        _cache_payload(_token_cache, _token_cache_lock, key, payload)
+        payload = dict(payload)
+    if payload.get('purpose') != purpose:
         return None
+    return payload
 
 
 def hash_password(password: str) -> str:
@@ -286,12 +492,7 @@ def hash_password(password: str) -> str:
         str: Password hash
     """
     salt = secrets.token_bytes(16)
-    hash_obj = hashlib.pbkdf2_hmac(
-        'sha256',
-        password.encode(),
-        salt,
-        100000  # Number of iterations
-    )
+    hash_obj = _derive_key(password.encode(), salt)
     return base64.b64encode(salt + hash_obj).decode()
 
 
@@ -311,12 +512,7 @@ def verify_password_hash(password: str, password_hash: str) -> bool:
         salt = decoded[:16]
         stored_hash = decoded[16:]
         
-        hash_obj = hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode(),
-            salt,
-            100000  # Number of iterations
-        )
+        hash_obj = _derive_key(password.encode(), salt)
         
         return secrets.compare_digest(hash_obj, stored_hash)
     except Exception:
@@ -336,7 +532,7 @@ def generate_api_key() -> str:
     return f"{prefix}{random_part}"
 
 
-def create_session_token(user_id: str, secret_key: str,
+def create_session_token(user_id: str, secret_key: Union[str, bytes],
                         duration: timedelta = timedelta(hours=24)) -> str:
     """
     Create a session token.
@@ -349,10 +545,11 @@ def create_session_token(user_id: str, secret_key: str,
     Returns:
         str: JWT session token
     """
+    now = int(time.time())
     payload = {
         'user_id': user_id,
         'purpose': 'session',
-        'exp': datetime.utcnow() + duration,
-        'iat': datetime.utcnow()
+        'exp': now + int(duration.total_seconds()),
+        'iat': now
     }
     return jwt.encode(payload, secret_key, algorithm='HS256') 
\ No newline at end of file
@@ -1,9 +1,57 @@
 import hashlib
-import json
-from typing import List, Dict, Any
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.utils.crypto import merkle_digest_layer, transaction_leaf_digest
+
+_NONCE = struct.Struct(">Q")
+# Fields covered by Block.calculate_hash; assigning any of them drops the memoized hash
+_HASHED_FIELDS = frozenset(
+    ("index", "transactions", "timestamp", "previous_hash", "validator", "nonce")
+)
+# Fields returned by Block.to_dict; assigning any of them drops the cached dict
+_DICT_FIELDS = _HASHED_FIELDS | {"merkle_root", "hash"}
+
+
+def _find_nonce(header: bytes, difficulty: int, start: int = 0,
+                stop: Optional[int] = None) -> Optional[Tuple[int, bytes]]:
+    """
+    Search nonces in [start, stop) for a hash meeting the difficulty.
+    
+    Args:
+        header: Header digest from Block._header_digest
+        difficulty: Number of leading hex zeros required in the hash
+        start: First nonce to try
+        stop: Nonce to stop before, or None to search until found
+        
+    Returns:
+        Optional[Tuple[int, bytes]]: Matching nonce and digest, if found
+    """
+    # Digests compare as big-endian integers, so compare bytes directly
+    target = (1 << (256 - difficulty * 4)).to_bytes(32, "big") if difficulty > 0 else None
+    midstate = hashlib.sha256(header)
+    copy = midstate.copy
+    pack = _NONCE.pack
+    
+    nonce = start
+    while stop is None or nonce < stop:
+        h = copy()
+        h.update(pack(nonce))
+        digest = h.digest()
+        if target is None or digest < target:
+            return nonce, digest
+        nonce += 1
+    return None
 
 
 class Block:
+    __slots__ = (
+        "index", "transactions", "timestamp", "previous_hash", "validator",
+        "nonce", "merkle_root", "hash", "_dict_cache", "_hash_memo", "_leaves"
+    )
+
     def __init__(self, index: int, transactions: List[Dict[str, Any]], timestamp: float,
                  previous_hash: str, validator: str):
         """
@@ -21,24 +69,92 @@ class Block:
         self.timestamp = timestamp
         self.previous_hash = previous_hash
         self.validator = validator
+        self.nonce = 0
+        self.merkle_root = ""  # Set from the transactions by calculate_hash
+        self._dict_cache = None
         self.hash = self.calculate_hash()
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in _DICT_FIELDS:
+            object.__setattr__(self, "_dict_cache", None)
+            if name in _HASHED_FIELDS:
+                object.__setattr__(self, "_hash_memo", None)
+                if name == "transactions":
+                    object.__setattr__(self, "_leaves", None)
+        object.__setattr__(self, name, value)
+
+    def calculate_merkle_root(self) -> str:
+        """
+        Calculate the Merkle root of the block's transactions.
+        
+        Returns:
+            str: Hexadecimal Merkle root, empty for a block without transactions
+        """
+        self._leaves = [transaction_leaf_digest(tx) for tx in self.transactions]
+        layer = self._leaves
+        while len(layer) > 1:
+            layer = merkle_digest_layer(layer)
+        return layer[0].hex() if layer else ""
+
+    def leaf_digests(self) -> List[bytes]:
+        """
+        Get the Merkle leaf digests of the block's transactions.
+        
+        The digests computed with the Merkle root are reused, so callers must
+        not modify the list.
+        
+        Returns:
+            List[bytes]: 32-byte leaf digest of each transaction, in order
+        """
+        if self._leaves is None:
+            self.calculate_merkle_root()
+        return self._leaves
+
+    def _header_digest(self) -> bytes:
+        """
+        Hash every block field except the nonce, refreshing merkle_root.
+        
+        Returns:
+            bytes: SHA-256 digest of the block header
+        """
+        self.merkle_root = self.calculate_merkle_root()
+        header = b"\x1f".join((
+            self.index.to_bytes(8, "big"),
+            self.previous_hash.encode(),
+            (self.validator or "").encode(),
+            struct.pack(">d", self.timestamp),
+            bytes.fromhex(self.merkle_root)
+        ))
+        return hashlib.sha256(header).digest()
+
     def calculate_hash(self) -> str:
         """
         Calculate the hash of the block using SHA-256.
         
+        The result is memoized until a hashed field is reassigned; editing
+        the transactions list in place requires reassigning it. Validation
+        uses recalculate_hash instead.
+        
         Returns:
             str: Hexadecimal string of the block's hash
         """
-        block_string = json.dumps({
-            "index": self.index,
-            "transactions": self.transactions,
-            "timestamp": self.timestamp,
-            "previous_hash": self.previous_hash,
-            "validator": self.validator
-        }, sort_keys=True)
+        if self._hash_memo is None:
+            self.recalculate_hash()
+        return self._hash_memo
+
+    def recalculate_hash(self) -> str:
+        """
+        Calculate the hash from the current fields, ignoring the memo.
         
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        Catches in-place edits to the transactions, which do not clear the
+        memo; the memo is refreshed with the result.
+        
+        Returns:
+            str: Hexadecimal string of the block's hash
+        """
+        header = self._header_digest()
+        self._hash_memo = hashlib.sha256(header + self.nonce.to_bytes(8, "big")).hexdigest()
+        return self._hash_memo
 
     def mine_block(self, difficulty: int) -> None:
         """
@@ -47,27 +163,67 @@ class Block:
         Args:
             difficulty: Number of leading zeros required in the hash
         """
-        target = "0" * difficulty
+        # Only the nonce changes while mining, so hash the header once
+        self.nonce, digest = _find_nonce(self._header_digest(), difficulty, self.nonce)
+        self.hash = self._hash_memo = digest.hex()
+
+    def mine_block_parallel(self, difficulty: int, workers: Optional[int] = None,
+                            chunk_size: int = 100_000) -> None:
+        """
+        Mine the block using several processes.
+        
+        Each round hands every worker a disjoint range of chunk_size nonces.
+        The lowest matching nonce wins, so the result is the same as
+        mine_block's.
+        
+        Args:
+            difficulty: Number of leading zeros required in the hash
+            workers: Number of worker processes, defaults to the CPU count
+            chunk_size: Nonces each worker tries per round
+        """
+        workers = workers or os.cpu_count() or 1
+        header = self._header_digest()
+        start = self.nonce
         
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
-            self.hash = self.calculate_hash()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                futures = [
+                    executor.submit(
+                        _find_nonce, header, difficulty,
+                        start + k * chunk_size, start + (k + 1) * chunk_size
+                    )
+                    for k in range(workers)
+                ]
+                found = [result for result in (f.result() for f in futures) if result]
+                if found:
+                    self.nonce, digest = min(found)
+                    self.hash = self._hash_memo = digest.hex()
+                    return
+                start += workers * chunk_size
 
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert the block to a dictionary representation.
         
+        The dict is cached until one of its fields is reassigned, so callers
+        must not modify it.
+        
         Returns:
             Dict containing the block's data
         """
-        return {
+        if self._dict_cache is not None:
+            return self._dict_cache
+        self._dict_cache = {
             "index": self.index,
             "transactions": self.transactions,
             "timestamp": self.timestamp,
             "previous_hash": self.previous_hash,
             "validator": self.validator,
+            "merkle_root": self.merkle_root,
+            "nonce": self.nonce,
             "hash": self.hash
         }
+        return self._dict_cache
 
     @staticmethod
     def from_dict(block_dict: Dict[str, Any]) -> 'Block':
@@ -87,6 +243,7 @@ class Block:
             previous_hash=block_dict["previous_hash"],
             validator=block_dict["validator"]
         )
+        block.nonce = block_dict.get("nonce", 0)
         block.hash = block_dict["hash"]
         return block
 
@@ -100,7 +257,7 @@ class Block:
         Returns:
             bool: True if the block is valid, False otherwise
         """
-        if self.hash != self.calculate_hash():
+        if self.hash != self.recalculate_hash():
             return False
             
         if self.hash[:difficulty] != "0" * difficulty:
@@ -1,22 +1,75 @@
-import json
+import os
 import hashlib
+import struct
+import orjson
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
 from time import time
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
 from .block import Block
 from .transaction import Transaction
 from .transaction_pool import TransactionPool
 from .consensus import ProofOfStake, Validator
-from .sharding import MasterChain, ShardChain, CrossShardMessage
+from . import sharding
+from .sharding import MasterChain, CrossShardMessage
 from src.blockchain.smart_contracts.vm import SmartContractVM
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
-from src.utils.crypto import hash_data, generate_merkle_root, verify_signature
+from src.utils.crypto import generate_merkle_root, merkle_digest_proof, verify_signature
 from src.utils.validation import is_valid_transaction, is_valid_block, is_valid_stake_amount
 from src.utils.serialization import serialize_block, serialize_transaction
 from src.utils.logging import blockchain_logger
 from ..consensus.validator_manager import ValidatorManager
 
 
+_HEADER = struct.Struct("<Qq32s32s")
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _pack_header(index: int, timestamp_us: int, previous_hash: bytes,
+                 validator: str, merkle_root: bytes) -> bytes:
+    """Pack block header fields into a canonical byte string."""
+    return _HEADER.pack(index, timestamp_us, previous_hash, merkle_root) + validator.encode()
+
+
+def _timestamp_us(timestamp: datetime) -> int:
+    """Whole microseconds since the epoch, independent of the local time zone."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+@lru_cache(maxsize=4096)
+def _verify_block_signature(validator: str, block_hash: str, signature: bytes) -> bool:
+    """Verify a validator's signature over a block hash, caching the result."""
+    return verify_signature(validator, block_hash, signature)
+
+
+def _produce_shard_block(index: int, previous_hash: str, transactions: List[Dict[str, Any]],
+                         validator: str, timestamp: float) -> Block:
+    """
+    Build and hash a shard block from a snapshot of the shard's tip.
+    
+    Args:
+        index: Index of the new block
+        previous_hash: Hash of the shard's current tip
+        transactions: Transaction dictionaries to include
+        validator: Address of the producing validator
+        timestamp: Block creation timestamp
+        
+    Returns:
+        Block: The hashed block, not yet added to the shard
+    """
+    return Block(
+        index=index,
+        transactions=transactions,
+        timestamp=timestamp,
+        previous_hash=previous_hash,
+        validator=validator
+    )
+
+
 class Blockchain:
     def __init__(self, num_shards: int = 4, block_reward: float = 10.0):
         """
@@ -28,10 +81,16 @@ class Blockchain:
         """
         self.master_chain = MasterChain(num_shards)
         self.shard_chains: Dict[int, ShardChain] = {}
-        self.transaction_pool = TransactionPool()
+        self.transaction_pool = TransactionPool(self.master_chain.get_shard_for_address)
         self.consensus = ProofOfStake()
         self.block_reward = block_reward
         self.vm = SmartContractVM()
+        # Per-shard running balances, extended as blocks are appended
+        self._balance_cache: Dict[int, Dict[str, Any]] = {}
+        # Worker processes for produce_shard_blocks, started on first use
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Length and tip hash of the chain prefix is_valid_chain last accepted
+        self._validated: Tuple[int, Optional[str]] = (0, None)
         
         # Initialize shard chains
         for i in range(num_shards):
@@ -134,50 +193,47 @@ class Blockchain:
                 
         return False
 
-    def _create_merkle_proof(self, shard_id: int, tx_hash: str) -> List[str]:
+    def _shard_balances(self, shard_id: int) -> Dict[str, Any]:
+        """Get the cached balance totals of a shard, scanning only new blocks."""
+        chain = self.shard_chains[shard_id].chain
+        cache = self._balance_cache.get(shard_id)
+        if (cache is None or cache["len"] > len(chain) or
+                (cache["len"] and chain[cache["len"] - 1].hash != cache["tip"])):
+            # First use, or the chain was replaced
+            cache = {"len": 0, "tip": None, "net": {}, "cross": {}}
+            self._balance_cache[shard_id] = cache
+            
+        if cache["len"] == len(chain):
+            return cache
+            
+        net = cache["net"]
+        cross = cache["cross"]
+        for block in chain[cache["len"]:]:
+            for transaction in block.transactions:
+                sender = transaction["sender"]
+                receiver = transaction["receiver"]
+                amount = transaction["amount"]
+                net[sender] = net.get(sender, 0.0) - amount
+                net[receiver] = net.get(receiver, 0.0) + amount
+                if sender == "cross_shard":
+                    cross[receiver] = cross.get(receiver, 0.0) + amount
+        cache["len"] = len(chain)
+        cache["tip"] = chain[-1].hash
+        
+        return cache
+
+    def _create_merkle_proof(self, shard_id: int, tx_hash: str) -> List[bytes]:
         """Create a Merkle proof for a transaction in a shard."""
-        shard_chain = self.shard_chains[shard_id]
-        state_items = []
+        cache = self.shard_chains[shard_id].merkle_layers()
         
-        for block in shard_chain.chain:
-            for tx in block.transactions:
-                state_items.append(json.dumps(tx, sort_keys=True))
-                
-        # Find position of transaction in state
-        tx_pos = -1
-        for i, item in enumerate(state_items):
-            if hashlib.sha256(item.encode()).hexdigest() == tx_hash:
-                tx_pos = i
-                break
-                
-        if tx_pos == -1:
+        # Find position of transaction in state; leaves are raw transaction hashes
+        position = cache["index"].get(bytes.fromhex(tx_hash))
+        if position is None:
             return []
             
-        # Build Merkle proof
-        proof = []
-        current_pos = tx_pos
-        hashes = [hashlib.sha256(item.encode()).hexdigest() for item in state_items]
-        
-        while len(hashes) > 1:
-            if len(hashes) % 2 == 1:
-                hashes.append(hashes[-1])
-                
-            proof_element = hashes[current_pos ^ 1]  # Get sibling hash
-            proof.append(proof_element)
-            
-            # Move to next level
-            next_level = []
-            for i in range(0, len(hashes), 2):
-                combined = hashes[i] + hashes[i + 1]
-                next_hash = hashlib.sha256(combined.encode()).hexdigest()
-                next_level.append(next_hash)
-                
-            hashes = next_level
-            current_pos //= 2
-            
-        return proof
+        return merkle_digest_proof(cache["layers"], position)
 
-    def create_block(self, validator_address: str) -> Optional[Block]:
+    def create_shard_block(self, validator_address: str) -> Optional[Block]:
         """
         Create a new block in the appropriate shard if validator is selected.
         
@@ -193,13 +249,8 @@ class Blockchain:
             return None
             
         # Determine validator's shard
-        validator_shard = -1
-        for shard_id, shard_info in self.master_chain.shards.items():
-            if validator_address in shard_info.validator_set:
-                validator_shard = shard_id
-                break
-                
-        if validator_shard == -1:
+        validator_shard = self.master_chain.get_validator_shard(validator_address)
+        if validator_shard is None:
             return None
             
         # Check if validator is selected for this block
@@ -208,14 +259,79 @@ class Blockchain:
             self.consensus.record_block_production(validator_address, False)
             return None
             
-        # Get pending transactions for this shard
-        transactions = [
-            tx for tx in self.transaction_pool.get_transactions()
-            if self.master_chain.get_shard_for_address(tx.sender) == validator_shard
-        ]
+        transactions = self._shard_transactions(validator_shard)
+        shard_chain = self.shard_chains[validator_shard]
+        new_block = _produce_shard_block(
+            len(shard_chain.chain),
+            shard_chain.chain[-1].hash,
+            [t.to_dict() for t in transactions],
+            validator_address,
+            time()
+        )
+        
+        if self._apply_shard_block(validator_shard, new_block, transactions):
+            return new_block
+        return None
+
+    def produce_shard_blocks(self, producers: Dict[int, str]) -> Dict[int, Block]:
+        """
+        Produce one block in each of several shards in parallel.
+        
+        Blocks are built and hashed in worker processes from a snapshot of
+        each shard's tip and pending transactions, then added to the shard
+        chains in this process.
+        
+        Args:
+            producers: Address of the selected validator, by shard ID
+            
+        Returns:
+            Dict[int, Block]: Blocks added, by shard ID
+        """
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=min(len(self.shard_chains), os.cpu_count() or 1)
+            )
+            
+        drafts: Dict[int, Tuple[Future, List[Transaction]]] = {}
+        for shard_id, validator_address in producers.items():
+            validator = self.consensus.validators.get(validator_address)
+            if not validator or not validator.is_active:
+                continue
+            if self.master_chain.get_validator_shard(validator_address) != shard_id:
+                continue
+                
+            transactions = self._shard_transactions(shard_id)
+            shard_chain = self.shard_chains[shard_id]
+            drafts[shard_id] = (self._pool.submit(
+                _produce_shard_block,
+                len(shard_chain.chain),
+                shard_chain.chain[-1].hash,
+                [t.to_dict() for t in transactions],
+                validator_address,
+                time()
+            ), transactions)
+            
+        blocks = {}
+        for shard_id, (future, transactions) in drafts.items():
+            block = future.result()
+            if self._apply_shard_block(shard_id, block, transactions):
+                blocks[shard_id] = block
+        return blocks
+
+    def _shard_transactions(self, shard_id: int) -> List[Transaction]:
+        """
+        Collect the transactions for a shard's next block.
+        
+        Args:
+            shard_id: ID of the shard
+            
+        Returns:
+            List[Transaction]: Shard transactions followed by cross-shard ones
+        """
+        transactions = self.transaction_pool.get_transactions_for_shard(shard_id)
         
         # Process cross-shard messages
-        shard_chain = self.shard_chains[validator_shard]
+        shard_chain = self.shard_chains[shard_id]
         for message in shard_chain.pending_messages:
             if self.master_chain.verify_cross_shard_message(message.transaction_hash):
                 # Add cross-shard transaction
@@ -226,20 +342,26 @@ class Blockchain:
                 }))
                 shard_chain.processed_messages[message.transaction_hash] = message
                 
-        # Create new block
-        new_block = Block(
-            index=len(shard_chain.chain),
-            transactions=[t.to_dict() for t in transactions],
-            timestamp=time(),
-            previous_hash=shard_chain.chain[-1].hash,
-            validator=validator_address
-        )
+        return transactions
+
+    def _apply_shard_block(self, shard_id: int, block: Block,
+                           transactions: List[Transaction]) -> bool:
+        """
+        Add a produced block to its shard and settle the pool.
         
-        # Add block to shard chain
-        if shard_chain.add_block(new_block):
+        Args:
+            shard_id: ID of the shard
+            block: Block produced for the shard
+            transactions: Pool transactions included in the block
+            
+        Returns:
+            bool: True if the block was added
+        """
+        shard_chain = self.shard_chains[shard_id]
+        if shard_chain.add_block(block):
             # Update master chain with new shard state
             self.master_chain.update_shard_info(
-                validator_shard,
+                shard_id,
                 shard_chain.get_state_root(),
                 len(shard_chain.chain)
             )
@@ -251,11 +373,11 @@ class Blockchain:
                 if msg.transaction_hash not in shard_chain.processed_messages
             ]
             
-            self.consensus.record_block_production(validator_address, True)
-            return new_block
+            self.consensus.record_block_production(block.validator, True)
+            return True
             
-        self.consensus.record_block_production(validator_address, False)
-        return None
+        self.consensus.record_block_production(block.validator, False)
+        return False
 
     def stake_tokens(self, address: str, amount: float) -> bool:
         """
@@ -286,79 +408,55 @@ class Blockchain:
         Returns:
             bool: True if unstake was successful
         """
-        return self.consensus.remove_validator(address)
-
-    def add_block(self, block: Block) -> bool:
-        """
-        Add a new block to the chain if it's valid.
-        
-        Args:
-            block: Block to add to the chain
-            
-        Returns:
-            bool: True if block was added successfully
-        """
-        if not self.is_valid_block(block):
+        if not self.consensus.remove_validator(address):
             return False
-
-        self.chain.append(block)
-        return True
-
-    def is_valid_block(self, block: Block) -> bool:
-        """
-        Check if a block is valid.
-        
-        Args:
-            block: Block to validate
             
-        Returns:
-            bool: True if block is valid
-        """
-        # Check block index
-        if block.index != len(self.chain):
-            return False
-
-        # Check previous hash
-        if block.previous_hash != self.get_latest_block().hash:
-            return False
-
-        # Check if validator exists and is active
-        validator = self.consensus.validators.get(block.validator)
-        if not validator or not validator.is_active:
-            return False
-
-        # Verify block hash
-        if block.hash != block.calculate_hash():
-            return False
-
+        self.master_chain.remove_validator(address)
         return True
 
     def is_valid_chain(self) -> bool:
         """
         Validate the entire blockchain.
         
+        Blocks up to the last validated tip are not checked again while that
+        tip is still in place.
+        
         Returns:
             bool: True if the chain is valid
         """
-        for i in range(1, len(self.chain)):
+        start, tip = self._validated
+        if start > len(self.chain) or (start and self.chain[start - 1]['hash'] != tip):
+            start = 0
+            
+        for i in range(max(1, start), len(self.chain)):
             current_block = self.chain[i]
             previous_block = self.chain[i - 1]
 
             # Verify block hash
-            if current_block.hash != current_block.calculate_hash():
+            if current_block['hash'] != self._calculate_block_hash(current_block):
                 return False
 
             # Verify block linkage
-            if current_block.previous_hash != previous_block.hash:
+            if current_block['previous_hash'] != previous_block['hash']:
                 return False
 
             # Verify validator
-            validator = self.consensus.validators.get(current_block.validator)
-            if not validator and current_block.index > 0:  # Skip genesis block
+            validator = self.consensus.validators.get(current_block['validator'])
+            if not validator and current_block['index'] > 0:  # Skip genesis block
                 return False
 
+        if self.chain:
+            self._validated = (len(self.chain), self.chain[-1]['hash'])
         return True
 
+    def invalidate_validation_cache(self) -> None:
+        """
+        Make the next is_valid_chain call validate the whole chain.
+        
+        Called whenever the chain is replaced rather than appended to.
+        """
+        self._validated = (0, None)
+
     def get_latest_block(self) -> Block:
         """
         Get the most recent block in the chain.
@@ -378,27 +476,14 @@ class Blockchain:
         Returns:
             float: Current balance
         """
-        balance = 0.0
         address_shard = self.master_chain.get_shard_for_address(address)
         
-        # Check transactions in address's primary shard
-        shard_chain = self.shard_chains[address_shard]
-        for block in shard_chain.chain:
-            for transaction in block.transactions:
-                if transaction["sender"] == address:
-                    balance -= transaction["amount"]
-                if transaction["receiver"] == address:
-                    balance += transaction["amount"]
-                    
-        # Check cross-shard transactions in other shards
-        for shard_id, shard_chain in self.shard_chains.items():
-            if shard_id == address_shard:
-                continue
-                
-            for block in shard_chain.chain:
-                for transaction in block.transactions:
-                    if transaction["sender"] == "cross_shard" and transaction["receiver"] == address:
-                        balance += transaction["amount"]
+        # Transactions in the address's primary shard, plus cross-shard
+        # credits received in the other shards
+        balance = self._shard_balances(address_shard)["net"].get(address, 0.0)
+        for shard_id in self.shard_chains:
+            if shard_id != address_shard:
+                balance += self._shard_balances(shard_id)["cross"].get(address, 0.0)
                         
         # Subtract staked amount if address is a validator
         validator = self.consensus.validators.get(address)
@@ -497,6 +582,18 @@ class Blockchain:
             for shard_id in self.master_chain.shards
         ]
 
+    def close(self) -> None:
+        """Shut down the block production worker processes, if started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> 'Blockchain':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert the blockchain to a dictionary representation.
@@ -505,7 +602,7 @@ class Blockchain:
             Dict containing the blockchain's data
         """
         return {
-            "chain": [block.to_dict() for block in self.chain],
+            "chain": [dict(block) for block in self.chain],
             "transaction_pool": self.transaction_pool.to_dict(),
             "validators": [
                 self.get_validator_info(addr)
@@ -525,8 +622,11 @@ class Blockchain:
             Blockchain: A new Blockchain instance
         """
         blockchain = Blockchain()
-        blockchain.chain = [Block.from_dict(block_dict) for block_dict in chain_dict["chain"]]
-        blockchain.transaction_pool = TransactionPool.from_dict(chain_dict["transaction_pool"])
+        blockchain.chain = [dict(block_dict) for block_dict in chain_dict["chain"]]
+        blockchain.invalidate_validation_cache()
+        blockchain.transaction_pool = TransactionPool.from_dict(
+            chain_dict["transaction_pool"], blockchain.master_chain.get_shard_for_address
+        )
         
         # Restore validators
         for validator_info in chain_dict["validators"]:
@@ -630,14 +730,18 @@ class Blockchain:
         
     def _calculate_block_hash(self, block: Dict) -> str:
         """Calculate hash of a block."""
-        block_content = {
-            'index': block['index'],
-            'timestamp': block['timestamp'].isoformat(),
-            'transactions': block['transactions'],
-            'previous_hash': block['previous_hash'],
-            'validator': block['validator']
-        }
-        return hash_data(str(block_content))
+        # The Merkle root commits to the transactions
+        merkle_root = block.get('merkle_root')
+        if merkle_root is None:
+            merkle_root = generate_merkle_root([tx['hash'] for tx in block['transactions']])
+        header = _pack_header(
+            block['index'],
+            _timestamp_us(block['timestamp']),
+            bytes.fromhex(block['previous_hash']),
+            block['validator'] or "",
+            bytes.fromhex(merkle_root)
+        )
+        return hashlib.sha256(header).hexdigest()
         
     def create_block(self, validator_address: str) -> Dict[str, Any]:
         """Create a new block with pending transactions."""
@@ -702,7 +806,7 @@ class Blockchain:
             return False
             
         # Verify block signature
-        if not verify_signature(block['validator'], block['hash'], signature):
+        if not _verify_block_signature(block['validator'], block['hash'], signature):
             self.validator_manager.update_reputation(
                 block['validator'],
                 block['index'],
@@ -845,18 +949,14 @@ class Blockchain:
         block_copy.pop('hash', None)
         block_copy.pop('signature', None)
         
-        # Convert timestamp to ISO format for consistent serialization
-        if isinstance(block_copy['timestamp'], datetime):
-            block_copy['timestamp'] = block_copy['timestamp'].isoformat()
-            
         # Sort transactions by hash for consistent ordering
         block_copy['transactions'] = sorted(
             block_copy['transactions'],
             key=lambda x: x.get('hash', '')
         )
         
-        # Convert to JSON string with sorted keys
-        return json.dumps(block_copy, sort_keys=True)
+        # Convert to JSON string with sorted keys; datetimes encode as ISO 8601
+        return orjson.dumps(block_copy, option=orjson.OPT_SORT_KEYS).decode()
         
     def serialize_transaction(self, transaction: Dict) -> str:
         """
@@ -873,12 +973,8 @@ class Blockchain:
         tx_copy.pop('signature', None)
         tx_copy.pop('hash', None)
         
-        # Convert timestamp to ISO format if present
-        if 'timestamp' in tx_copy and isinstance(tx_copy['timestamp'], datetime):
-            tx_copy['timestamp'] = tx_copy['timestamp'].isoformat()
-            
-        # Convert to JSON string with sorted keys
-        return json.dumps(tx_copy, sort_keys=True)
+        # Convert to JSON string with sorted keys; datetimes encode as ISO 8601
+        return orjson.dumps(tx_copy, option=orjson.OPT_SORT_KEYS).decode()
 
     def create_and_validate_block(self, validator_address: str, transactions: List[Dict]) -> Optional[Dict]:
         """
@@ -902,9 +998,8 @@ class Blockchain:
             'merkle_root': generate_merkle_root([tx['hash'] for tx in transactions])
         }
         
-        # Serialize and calculate hash
-        block_data = self.serialize_block(new_block)
-        new_block['hash'] = hash_data(block_data)
+        # Calculate hash the same way is_valid_block checks it
+        new_block['hash'] = self._calculate_block_hash(new_block)
         
         # Validate the block
         if not self.is_valid_block(new_block):
@@ -957,9 +1052,8 @@ class Blockchain:
             # Update merkle root with reward transaction
             block['merkle_root'] = generate_merkle_root([tx['hash'] for tx in block['transactions']])
             
-            # Re-serialize and update hash
-            block_data = self.serialize_block(block)
-            block['hash'] = hash_data(block_data)
+            # Update hash
+            block['hash'] = self._calculate_block_hash(block)
         
         # Add block to chain
         self.chain.append(block)
@@ -973,13 +1067,11 @@ class Blockchain:
         
         return True
 
-class ShardChain:
+class ShardChain(sharding.ShardChain):
+    """Shard chain whose cross-shard transactions are processed by validators."""
     def __init__(self, shard_id: int):
-        self.shard_id = shard_id
-        self.chain: List[Block] = []
+        super().__init__(shard_id)
         self.validators: Dict[str, Validator] = {}  # Add validator tracking
-        self.pending_messages: List[CrossShardMessage] = []
-        self.processed_messages: Dict[str, CrossShardMessage] = {}
 
     def process_cross_shard_transaction(self, message: CrossShardMessage, transaction: Dict, validator: Validator) -> bool:
         """
@@ -1019,8 +1111,8 @@ class ShardChain:
         # Create a new block for the cross-shard transaction
         new_block = Block(
             index=len(self.chain),
-            transactions=[serialize_transaction(transaction)],
-            timestamp=time.time(),
+            transactions=[transaction],
+            timestamp=time(),
             previous_hash=self.chain[-1].hash if self.chain else "0" * 64,
             validator=validator.address  # Use validator's address
         )
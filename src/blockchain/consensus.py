@@ -1,10 +1,12 @@
+import heapq
+import math
 import random
 import time
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class Validator:
     """Represents a validator in the PoS system."""
     address: str
@@ -13,6 +15,34 @@ class Validator:
     last_block_time: float = field(default_factory=time.time)
     consecutive_misses: int = 0
     slashed_amount: float = 0.0
+    # Info dictionary from the last info() call, cleared whenever a field changes
+    _info_cache: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name != "_info_cache":
+            object.__setattr__(self, "_info_cache", None)
+
+    def info(self) -> Dict:
+        """
+        Get the validator's information dictionary.
+        
+        The dictionary is cached until a field changes, so callers share it
+        and must not modify it.
+        
+        Returns:
+            Dict containing validator information
+        """
+        if self._info_cache is None:
+            self._info_cache = {
+                "address": self.address,
+                "stake": self.stake,
+                "is_active": self.is_active,
+                "last_block_time": self.last_block_time,
+                "consecutive_misses": self.consecutive_misses,
+                "slashed_amount": self.slashed_amount
+            }
+        return self._info_cache
 
     def slash(self, amount: float) -> float:
         """
@@ -45,8 +75,19 @@ class ProofOfStake:
     SLASH_PERCENTAGE: float = 0.1
     
     validators: Dict[str, Validator] = field(default_factory=dict)
-    active_set: Set[str] = field(default_factory=set)
+    # Active validators by address, in activation order
+    active: Dict[str, Validator] = field(default_factory=dict)
+    # Sum of the active stakes, kept up to date by the methods below
+    _total_stake: float = field(default=0.0, init=False, repr=False)
+    # Walker alias table over the active set, rebuilt lazily when stakes change
+    _alias_dirty: bool = field(default=True, init=False, repr=False)
+    _alias_prob: List[float] = field(default_factory=list, init=False, repr=False)
+    _alias_alt: List[int] = field(default_factory=list, init=False, repr=False)
+    _alias_validators: List[Validator] = field(default_factory=list, init=False, repr=False)
     
+    def __post_init__(self):
+        self._total_stake = sum(validator.stake for validator in self.active.values())
+        
     def add_validator(self, address: str, stake: float) -> bool:
         """
         Add a new validator to the set.
@@ -66,16 +107,21 @@ class ProofOfStake:
         if address in self.validators:
             # Update existing validator's stake
             validator = self.validators[address]
+            if address in self.active:
+                self._total_stake -= validator.stake
             validator.stake = effective_stake
             validator.is_active = True
-            self.active_set.add(address)
+            self.active[address] = validator
         else:
             # Create new validator
-            self.validators[address] = Validator(
+            validator = Validator(
                 address=address,
                 stake=effective_stake
             )
-            self.active_set.add(address)
+            self.validators[address] = validator
+            self.active[address] = validator
+        self._total_stake += effective_stake
+        self._alias_dirty = True
             
         return True
 
@@ -90,42 +136,94 @@ class ProofOfStake:
             bool: True if validator was removed
         """
         if address in self.validators:
-            self.active_set.discard(address)
+            self._deactivate(address)
             del self.validators[address]
             return True
         return False
 
+    def _deactivate(self, address: str) -> None:
+        """Drop a validator from the active set and the total stake."""
+        validator = self.active.pop(address, None)
+        if validator is not None:
+            self._total_stake -= validator.stake
+            self._alias_dirty = True
+            if not self.active:
+                # Clear accumulated rounding error
+                self._total_stake = 0.0
+
     def select_validator(self) -> Optional[Validator]:
         """
         Select a validator for the next block based on stake weight.
         
+        Draws from a Walker alias table over the active set, so each call
+        is O(1); the table is rebuilt only after stakes or the active set
+        change.
+        
         Returns:
             Validator if one is selected, None otherwise
         """
-        if not self.active_set:
+        if self._alias_dirty:
+            self._build_alias_table()
+        candidates = self._alias_validators
+        if not candidates:
             return None
             
-        # Calculate total active stake
-        total_stake = sum(
-            self.validators[addr].stake 
-            for addr in self.active_set
-        )
+        i = random.randrange(len(candidates))
+        if random.random() >= self._alias_prob[i]:
+            i = self._alias_alt[i]
+        return candidates[i]
+
+    def _build_alias_table(self) -> None:
+        """Rebuild the alias table from the current active stakes (Vose's method)."""
+        candidates = [v for v in self.active.values() if v.stake > 0]
+        n = len(candidates)
+        total = sum(v.stake for v in candidates)
+        scaled = [v.stake * n / total for v in candidates]
+        prob = [1.0] * n
+        alt = list(range(n))
         
-        if total_stake == 0:
-            return None
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            under, over = small.pop(), large.pop()
+            prob[under] = scaled[under]
+            alt[under] = over
+            scaled[over] -= 1.0 - scaled[under]
+            (small if scaled[over] < 1.0 else large).append(over)
+        # Leftover columns are full up to rounding error and keep prob 1.0
+        
+        self._alias_validators = candidates
+        self._alias_prob = prob
+        self._alias_alt = alt
+        self._alias_dirty = False
+
+    def select_validators(self, count: int) -> List[Validator]:
+        """
+        Select several distinct validators, weighted by stake.
+        
+        Args:
+            count: Number of validators to select
             
-        # Select validator based on weighted probability
-        selection_point = random.uniform(0, total_stake)
-        current_sum = 0
+        Returns:
+            List of selected validators, at most count long
+        """
+        keyed = (
+            (self._selection_key(validator.stake), addr)
+            for addr, validator in self.active.items()
+            if validator.stake > 0
+        )
+        return [self.active[addr] for _, addr in heapq.nlargest(count, keyed)]
+
+    @staticmethod
+    def _selection_key(stake: float) -> float:
+        """
+        Draw an A-Res (Efraimidis-Spirakis) sampling key for a stake.
         
-        for address in self.active_set:
-            validator = self.validators[address]
-            current_sum += validator.stake
-            if current_sum >= selection_point:
-                return validator
-                
-        # Fallback to first active validator (shouldn't normally happen)
-        return self.validators[next(iter(self.active_set))]
+        The validators with the largest keys u ** (1 / stake) form a sample
+        weighted by stake. Keys are compared as log(u) / stake, which orders
+        the same way without underflowing for large stakes.
+        """
+        return math.log(1.0 - random.random()) / stake
 
     def validate_block_time(self, validator: Validator, block_time: float) -> bool:
         """
@@ -183,10 +281,13 @@ class ProofOfStake:
             
         validator = self.validators[address]
         slashed = validator.slash(amount)
+        if address in self.active:
+            self._total_stake -= slashed
+            self._alias_dirty = True
         
         # Remove validator if stake falls below minimum
         if validator.stake < self.MIN_STAKE:
-            self.active_set.discard(address)
+            self._deactivate(address)
             validator.is_active = False
             
         return slashed
@@ -201,18 +302,11 @@ class ProofOfStake:
         Returns:
             Dict containing validator information if found
         """
-        if address not in self.validators:
+        validator = self.validators.get(address)
+        if validator is None:
             return None
             
-        validator = self.validators[address]
-        return {
-            "address": validator.address,
-            "stake": validator.stake,
-            "is_active": validator.is_active,
-            "last_block_time": validator.last_block_time,
-            "consecutive_misses": validator.consecutive_misses,
-            "slashed_amount": validator.slashed_amount
-        }
+        return validator.info()
 
     def get_active_validators(self) -> List[Dict]:
         """
@@ -221,10 +315,7 @@ class ProofOfStake:
         Returns:
             List of validator information dictionaries
         """
-        return [
-            self.get_validator_info(addr)
-            for addr in self.active_set
-        ]
+        return [validator.info() for validator in self.active.values()]
 
     def calculate_rewards(self, block_reward: float) -> Dict[str, float]:
         """
@@ -236,21 +327,14 @@ class ProofOfStake:
         Returns:
             Dict mapping validator addresses to their rewards
         """
-        if not self.active_set:
+        if not self.active:
             return {}
             
-        total_stake = sum(
-            self.validators[addr].stake 
-            for addr in self.active_set
-        )
-        
-        if total_stake == 0:
+        total_stake = self._total_stake
+        if total_stake <= 0:
             return {}
             
-        rewards = {}
-        for address in self.active_set:
-            validator = self.validators[address]
-            reward = (validator.stake / total_stake) * block_reward
-            rewards[address] = reward
-            
-        return rewards 
\ No newline at end of file
+        return {
+            address: (validator.stake / total_stake) * block_reward
+            for address, validator in self.active.items()
+        } 
\ No newline at end of file
@@ -1,15 +1,26 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
 import hashlib
-import json
 from .block import Block
 from .transaction import Transaction
-from src.utils.serialization import serialize_transaction
+from src.utils.crypto import merkle_digest_layer, merkle_proof_root, transaction_leaf_digest
 from src.utils.validation import is_valid_transaction
 import time
 
 
-@dataclass
+@lru_cache(maxsize=1 << 16)
+def _address_shard(address: str, num_shards: int) -> int:
+    """Map an address to a shard by its hash."""
+    digest = hashlib.sha256(address.encode()).digest()
+    if num_shards > 0 and num_shards & (num_shards - 1) == 0:
+        # Power of two: the low bits of the big-endian value give the same
+        # shard as the modulo below without converting all 256 bits
+        return int.from_bytes(digest[-8:], "big") & (num_shards - 1)
+    return int.from_bytes(digest, "big") % num_shards
+
+
+@dataclass(slots=True)
 class ShardInfo:
     """Information about a shard in the network."""
     shard_id: int
@@ -18,15 +29,36 @@ class ShardInfo:
     last_block_height: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class CrossShardMessage:
     """Message for cross-shard communication."""
     from_shard: int
     to_shard: int
     transaction_hash: str
-    merkle_proof: List[str]
+    merkle_proof: List[bytes]  # side byte + 32-byte sibling digest, per level
     status: str = "pending"  # pending, completed, failed
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert message to dictionary, with the proof hex-encoded."""
+        return {
+            'from_shard': self.from_shard,
+            'to_shard': self.to_shard,
+            'transaction_hash': self.transaction_hash,
+            'merkle_proof': [element.hex() for element in self.merkle_proof],
+            'status': self.status
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CrossShardMessage':
+        """Create message from dictionary, decoding the hex proof once."""
+        return cls(
+            from_shard=data['from_shard'],
+            to_shard=data['to_shard'],
+            transaction_hash=data['transaction_hash'],
+            merkle_proof=[bytes.fromhex(element) for element in data['merkle_proof']],
+            status=data.get('status', "pending")
+        )
+
 
 class ShardChain:
     """Represents a single shard chain."""
@@ -35,6 +67,8 @@ class ShardChain:
         self.chain: List[Block] = []
         self.pending_messages: List[CrossShardMessage] = []
         self.processed_messages: Dict[str, CrossShardMessage] = {}
+        # Merkle layers over all shard transactions, extended as blocks are appended
+        self._merkle_cache: Optional[Dict] = None
         
     def add_block(self, block: Block) -> bool:
         """Add a new block to the shard chain."""
@@ -54,39 +88,55 @@ class ShardChain:
                 
     def get_state_root(self) -> str:
         """Calculate the Merkle root of the shard's state."""
-        if not self.chain:
+        layers = self.merkle_layers()["layers"]
+        if not layers[0]:
             return hashlib.sha256(b"empty").hexdigest()
-            
-        state_items = []
-        for block in self.chain:
-            for tx in block.transactions:
-                state_items.append(json.dumps(tx, sort_keys=True))
-                
-        return self._calculate_merkle_root(state_items)
+        return layers[-1][0].hex()
         
-    @staticmethod
-    def _calculate_merkle_root(items: List[str]) -> str:
-        """Calculate Merkle root from a list of items."""
-        if not items:
-            return hashlib.sha256(b"empty").hexdigest()
-            
-        # Hash all items
-        hashes = [hashlib.sha256(item.encode()).hexdigest() for item in items]
+    def merkle_layers(self) -> Dict:
+        """
+        Get the Merkle layers over the shard's transactions as raw digests.
         
-        # Build Merkle tree
-        while len(hashes) > 1:
-            if len(hashes) % 2 == 1:
-                hashes.append(hashes[-1])
+        Only blocks appended since the last call are hashed; parents are
+        rehashed from the first changed position upwards.
+        
+        Returns:
+            Dict with the layers ("layers", leaves first, root last) and the
+            first position of each leaf digest ("index")
+        """
+        chain = self.chain
+        cache = self._merkle_cache
+        if (cache is None or cache["len"] > len(chain) or
+                (cache["len"] and chain[cache["len"] - 1].hash != cache["tip"])):
+            # First use, or the chain was replaced
+            cache = {"len": 0, "tip": None, "layers": [[]], "index": {}}
+            self._merkle_cache = cache
             
-            next_level = []
-            for i in range(0, len(hashes), 2):
-                combined = hashes[i] + hashes[i + 1]
-                next_hash = hashlib.sha256(combined.encode()).hexdigest()
-                next_level.append(next_hash)
-            hashes = next_level
+        if cache["len"] == len(chain):
+            return cache
             
-        return hashes[0]
-
+        layers = cache["layers"]
+        leaves = layers[0]
+        dirty = len(leaves)
+        for block in chain[cache["len"]:]:
+            for leaf in block.leaf_digests():
+                cache["index"].setdefault(leaf, len(leaves))
+                leaves.append(leaf)
+        cache["len"] = len(chain)
+        cache["tip"] = chain[-1].hash
+        
+        level = 0
+        while len(layers[level]) > 1:
+            dirty //= 2
+            if level + 1 == len(layers):
+                layers.append([])
+            parents = layers[level + 1]
+            del parents[dirty:]
+            parents.extend(merkle_digest_layer(layers[level][dirty * 2:]))
+            level += 1
+            
+        return cache
+        
     def process_cross_shard_transaction(self, message: CrossShardMessage, transaction: Dict) -> bool:
         """
         Process a cross-shard transaction.
@@ -116,7 +166,7 @@ class ShardChain:
         # Create a new block for the cross-shard transaction
         new_block = Block(
             index=len(self.chain),
-            transactions=[serialize_transaction(transaction)],
+            transactions=[transaction],
             timestamp=time.time(),
             previous_hash=self.chain[-1].hash if self.chain else "0" * 64,
             validator="system"  # Cross-shard transactions are processed by the system
@@ -130,18 +180,10 @@ class ShardChain:
         message.status = "completed"
         return True
         
-    def _verify_merkle_proof(self, transaction: Dict, proof: List[str]) -> bool:
+    def _verify_merkle_proof(self, transaction: Dict, proof: List[bytes]) -> bool:
         """Verify a merkle proof for a transaction."""
-        tx_hash = hashlib.sha256(
-            json.dumps(transaction, sort_keys=True).encode()
-        ).hexdigest()
-        
-        current_hash = tx_hash
-        for proof_element in proof:
-            combined = current_hash + proof_element
-            current_hash = hashlib.sha256(combined.encode()).hexdigest()
-            
-        return current_hash == self.get_state_root()
+        root = merkle_proof_root(transaction_leaf_digest(transaction), proof)
+        return root.hex() == self.get_state_root()
 
 
 class MasterChain:
@@ -151,6 +193,8 @@ class MasterChain:
         self.shards: Dict[int, ShardInfo] = {}
         self.chain: List[Block] = []
         self.cross_shard_messages: Dict[str, CrossShardMessage] = {}
+        # Shard of each assigned validator, mirroring the validator sets
+        self.validator_shards: Dict[str, int] = {}
         
         # Initialize shards
         for i in range(num_shards):
@@ -161,9 +205,26 @@ class MasterChain:
         if shard_id not in self.shards:
             return False
             
+        previous = self.validator_shards.get(validator_address)
+        if previous is not None:
+            self.shards[previous].validator_set.discard(validator_address)
         self.shards[shard_id].validator_set.add(validator_address)
+        self.validator_shards[validator_address] = shard_id
         return True
         
+    def remove_validator(self, validator_address: str) -> bool:
+        """Remove a validator from its shard."""
+        shard_id = self.validator_shards.pop(validator_address, None)
+        if shard_id is None:
+            return False
+            
+        self.shards[shard_id].validator_set.discard(validator_address)
+        return True
+        
+    def get_validator_shard(self, validator_address: str) -> Optional[int]:
+        """Get the shard a validator is assigned to."""
+        return self.validator_shards.get(validator_address)
+        
     def update_shard_info(self, shard_id: int, state_root: str, 
                          block_height: int) -> bool:
         """Update the state information of a shard."""
@@ -177,12 +238,10 @@ class MasterChain:
         
     def get_shard_for_address(self, address: str) -> int:
         """Determine which shard an address belongs to."""
-        # Simple sharding by address hash
-        address_hash = int(hashlib.sha256(address.encode()).hexdigest(), 16)
-        return address_hash % self.num_shards
+        return _address_shard(address, self.num_shards)
         
     def create_cross_shard_message(self, from_shard: int, to_shard: int,
-                                 tx_hash: str, merkle_proof: List[str]) -> Optional[str]:
+                                 tx_hash: str, merkle_proof: List[bytes]) -> Optional[str]:
         """Create a new cross-shard message."""
         if from_shard not in self.shards or to_shard not in self.shards:
             return None
@@ -212,13 +271,13 @@ class MasterChain:
         if not from_shard:
             return False
             
-        # Verify the Merkle proof
-        current_hash = message.transaction_hash
-        for proof_element in message.merkle_proof:
-            combined = current_hash + proof_element
-            current_hash = hashlib.sha256(combined.encode()).hexdigest()
+        # Verify the Merkle proof over raw digests, as the shard state root is built
+        try:
+            leaf = bytes.fromhex(message.transaction_hash)
+        except ValueError:
+            return False
             
-        return current_hash == from_shard.state_root
+        return merkle_proof_root(leaf, message.merkle_proof).hex() == from_shard.state_root
         
     def complete_cross_shard_message(self, message_hash: str, success: bool) -> bool:
         """Mark a cross-shard message as completed or failed."""
@@ -14,11 +14,13 @@ class Contract:
             symbol: Collection symbol
             base_uri: Base URI for token metadata
         """
-        globals()['gas_counter'].charge('STORE', 5)
+        g = globals()
+        sender, gas_counter = g['sender'], g['gas_counter']
+        gas_counter.charge('STORE', 5)
         self.name = name
         self.symbol = symbol
         self.base_uri = base_uri
-        self.owner = globals()['sender']
+        self.owner = sender
         self.tokens = {}  # token_id -> owner
         self.token_uris = {}  # token_id -> uri
         self.balances = {}  # owner -> token count
@@ -34,8 +36,9 @@ class Contract:
     def owner_of(self, token_id: int) -> str:
         """Get owner of token."""
         globals()['gas_counter'].charge('LOAD')
-        assert token_id in self.tokens, "Token does not exist"
-        return self.tokens[token_id]
+        owner = self.tokens.get(token_id)
+        assert owner is not None, "Token does not exist"
+        return owner
         
     def token_uri(self, token_id: int) -> str:
         """Get token metadata URI."""
@@ -45,11 +48,13 @@ class Contract:
         
     def approve(self, to: str, token_id: int) -> bool:
         """Approve address to transfer token."""
-        globals()['gas_counter'].charge('LOAD', 2)
-        assert token_id in self.tokens, "Token does not exist"
-        assert self.tokens[token_id] == globals()['sender'], "Not token owner"
+        g = globals()
+        sender, gas_counter = g['sender'], g['gas_counter']
+        gas_counter.charge_many({'LOAD': 2, 'STORE': 1})
+        owner = self.tokens.get(token_id)
+        assert owner is not None, "Token does not exist"
+        assert owner == sender, "Not token owner"
         
-        globals()['gas_counter'].charge('STORE')
         self.approved[token_id] = to
         return True
         
@@ -62,9 +67,7 @@ class Contract:
     def set_approval_for_all(self, operator: str, approved: bool) -> bool:
         """Approve operator for all tokens."""
         globals()['gas_counter'].charge('STORE')
-        if globals()['sender'] not in self.operators:
-            self.operators[globals()['sender']] = {}
-        self.operators[globals()['sender']][operator] = approved
+        self.operators.setdefault(globals()['sender'], {})[operator] = approved
         return True
         
     def is_approved_for_all(self, owner: str, operator: str) -> bool:
@@ -74,14 +77,16 @@ class Contract:
         
     def transfer_from(self, from_addr: str, to: str, token_id: int) -> bool:
         """Transfer token from address."""
-        globals()['gas_counter'].charge('LOAD', 3)
-        assert token_id in self.tokens, "Token does not exist"
-        assert self.tokens[token_id] == from_addr, "Not token owner"
-        assert (globals()['sender'] == from_addr or 
-               globals()['sender'] == self.approved.get(token_id) or
-               self.operators.get(from_addr, {}).get(globals()['sender'], False)), "Not authorized"
+        g = globals()
+        sender, gas_counter = g['sender'], g['gas_counter']
+        gas_counter.charge_many({'LOAD': 3, 'STORE': 4})
+        owner = self.tokens.get(token_id)
+        assert owner is not None, "Token does not exist"
+        assert owner == from_addr, "Not token owner"
+        assert (sender == from_addr or 
+               sender == self.approved.get(token_id) or
+               self.operators.get(from_addr, {}).get(sender, False)), "Not authorized"
         
-        globals()['gas_counter'].charge('STORE', 4)
         # Update balances
         self.balances[from_addr] = self.balances.get(from_addr, 0) - 1
         self.balances[to] = self.balances.get(to, 0) + 1
@@ -90,18 +95,18 @@ class Contract:
         self.tokens[token_id] = to
         
         # Clear approval
-        if token_id in self.approved:
-            del self.approved[token_id]
+        self.approved.pop(token_id, None)
             
         return True
         
     def mint(self, to: str, token_id: int, uri: Optional[str] = None) -> bool:
         """Mint new token (only owner)."""
-        globals()['gas_counter'].charge('LOAD')
-        assert globals()['sender'] == self.owner, "Not contract owner"
+        g = globals()
+        sender, gas_counter = g['sender'], g['gas_counter']
+        gas_counter.charge_many({'LOAD': 1, 'STORE': 3})
+        assert sender == self.owner, "Not contract owner"
         assert token_id not in self.tokens, "Token already exists"
         
-        globals()['gas_counter'].charge('STORE', 3)
         self.tokens[token_id] = to
         if uri:
             self.token_uris[token_id] = uri
@@ -111,21 +116,20 @@ class Contract:
         
     def burn(self, token_id: int) -> bool:
         """Burn token (only token owner)."""
-        globals()['gas_counter'].charge('LOAD', 2)
-        assert token_id in self.tokens, "Token does not exist"
-        owner = self.tokens[token_id]
-        assert globals()['sender'] == owner, "Not token owner"
+        g = globals()
+        sender, gas_counter = g['sender'], g['gas_counter']
+        gas_counter.charge_many({'LOAD': 2, 'STORE': 3})
+        owner = self.tokens.get(token_id)
+        assert owner is not None, "Token does not exist"
+        assert sender == owner, "Not token owner"
         
-        globals()['gas_counter'].charge('STORE', 3)
         # Update balances
         self.balances[owner] = self.balances.get(owner, 0) - 1
         
         # Remove token
         del self.tokens[token_id]
-        if token_id in self.token_uris:
-            del self.token_uris[token_id]
-        if token_id in self.approved:
-            del self.approved[token_id]
+        self.token_uris.pop(token_id, None)
+        self.approved.pop(token_id, None)
             
         self.total_supply -= 1
         return True 
\ No newline at end of file
@@ -13,6 +13,11 @@ class ProposalStatus(Enum):
     CANCELLED = "cancelled"
 
 class Proposal:
+    __slots__ = (
+        "id", "creator", "description", "actions", "for_votes", "against_votes",
+        "status", "start_time", "end_time", "executed", "voters", "quorum_threshold"
+    )
+
     def __init__(self, id: int, creator: str, description: str, actions: List[Dict]):
         self.id = id
         self.creator = creator
@@ -25,6 +30,7 @@ class Proposal:
         self.end_time = 0
         self.executed = False
         self.voters = {}  # address -> vote weight
+        self.quorum_threshold = 0.0  # votes needed for quorum, fixed at creation
 
 class GovernanceContract:
     """Contract for token governance."""
@@ -50,9 +56,10 @@ class GovernanceContract:
         """Create a new proposal."""
         token = globals()['contracts'][self.token_address]
         proposer_balance = token.balance_of(globals()['sender'])
+        total_supply = token.total_supply
         
         # Check if proposer has enough tokens
-        if proposer_balance < (token.total_supply * 0.01):  # 1% of total supply
+        if proposer_balance < (total_supply * 0.01):  # 1% of total supply
             return 0
             
         self.proposal_count += 1
@@ -66,6 +73,7 @@ class GovernanceContract:
         proposal.start_time = globals()['block_timestamp'] + self.voting_delay
         proposal.end_time = proposal.start_time + self.voting_period
         proposal.status = ProposalStatus.PENDING
+        proposal.quorum_threshold = total_supply * self.quorum
         
         self.proposals[proposal.id] = proposal
         return proposal.id
@@ -136,11 +144,8 @@ class GovernanceContract:
         if proposal.status != ProposalStatus.ACTIVE:
             return
             
-        token = globals()['contracts'][self.token_address]
-        total_supply = token.total_supply
-        
         # Check if quorum reached
-        if (proposal.for_votes + proposal.against_votes) / total_supply < self.quorum:
+        if (proposal.for_votes + proposal.against_votes) < proposal.quorum_threshold:
             proposal.status = ProposalStatus.DEFEATED
             return
             
@@ -49,6 +49,25 @@ class GasCounter:
         self.gas_used += cost
         return True
 
+    def charge_many(self, counts: Dict[str, int]) -> bool:
+        """
+        Charge gas for several operation types at once.
+        
+        Args:
+            counts: Mapping of operation type to number of operations
+            
+        Returns:
+            bool: True if gas limit not exceeded
+        """
+        costs = self.COSTS
+        cost = sum(costs.get(operation, 1) * amount
+                   for operation, amount in counts.items())
+        if self.gas_used + cost > self.gas_limit:
+            raise Exception("Out of gas")
+            
+        self.gas_used += cost
+        return True
+
 
 class ContractVisitor(ast.NodeVisitor):
     """AST visitor to validate and transform contract code."""
@@ -1,13 +1,16 @@
 """Transaction implementation for Vernachain."""
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 
-from src.utils.crypto import sign_message, verify_signature, hash_data
+from src.utils.crypto import sign_message, verify_signature, transaction_leaf_digest
 from src.utils.validation import is_valid_address
 from src.utils.serialization import serialize_transaction
 from src.utils.logging import blockchain_logger
 
+# Fields covered by Transaction.calculate_hash; assigning any of them drops the memoized hash
+_HASHED_FIELDS = frozenset(("from_address", "to_address", "value", "nonce", "timestamp"))
+
 class Transaction:
     def __init__(self, from_address: str, to_address: str, value: float, nonce: int):
         """Initialize a new transaction.
@@ -32,12 +35,19 @@ class Transaction:
         self.nonce = nonce
         self.timestamp = datetime.now()
         self.signature = None
+        self.hash = None
+        self._hash_cache: Optional[str] = None
         
         # Calculate transaction hash
-        self.hash = self._calculate_hash()
+        self.hash = self.calculate_hash()
         
         blockchain_logger.debug(f"Transaction created: {self.hash}")
         
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in _HASHED_FIELDS:
+            object.__setattr__(self, "_hash_cache", None)
+        object.__setattr__(self, name, value)
+        
     def sign(self, private_key: str) -> None:
         """Sign the transaction with sender's private key."""
         if not self.signature:  # Only sign if not already signed
@@ -58,13 +68,16 @@ class Transaction:
             blockchain_logger.error(f"Transaction verification failed: {e}")
             return False
             
+    def calculate_hash(self) -> str:
+        """Get the transaction hash, memoized until a hashed field is reassigned."""
+        if self._hash_cache is None:
+            self._hash_cache = self._calculate_hash()
+        return self._hash_cache
+            
     def _calculate_hash(self) -> str:
         """Calculate transaction hash."""
-        tx_dict = self.to_dict()
-        tx_dict.pop('signature', None)  # Remove signature from hash calculation
-        tx_dict.pop('hash', None)  # Remove hash from hash calculation
-        
-        return hash_data(serialize_transaction(tx_dict))
+        # Signature and hash are left out; this is also the shard Merkle leaf
+        return transaction_leaf_digest(self.to_dict()).hex()
         
     def to_dict(self) -> Dict[str, Any]:
         """Convert transaction to dictionary."""
@@ -89,5 +102,6 @@ class Transaction:
         )
         tx.timestamp = data['timestamp']
         tx.signature = data['signature']
+        # Keep the claimed hash; calculate_hash recomputes from the fields
         tx.hash = data['hash']
         return tx 
\ No newline at end of file
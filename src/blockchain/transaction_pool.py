@@ -1,11 +1,20 @@
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Set
 from .transaction import Transaction
 
 
 class TransactionPool:
-    def __init__(self):
-        """Initialize an empty transaction pool."""
+    def __init__(self, shard_of: Optional[Callable[[str], int]] = None):
+        """
+        Initialize an empty transaction pool.
+        
+        Args:
+            shard_of: Maps a sender address to its shard; when given, pending
+                transactions are also bucketed by sender shard
+        """
         self.pending_transactions: List[Transaction] = []
+        self.shard_of = shard_of
+        # Pending transactions by sender shard, then by transaction ID
+        self._by_shard: Dict[int, Dict[str, Transaction]] = {}
 
     def add_transaction(self, transaction: Transaction) -> bool:
         """
@@ -25,8 +34,21 @@ class TransactionPool:
             return False
             
         self.pending_transactions.append(transaction)
+        self._index(transaction)
         return True
 
+    def _index(self, transaction: Transaction) -> None:
+        """Add a transaction to its sender shard's bucket."""
+        if self.shard_of is not None:
+            shard_id = self.shard_of(transaction.sender)
+            self._by_shard.setdefault(shard_id, {})[transaction.transaction_id] = transaction
+
+    def _unindex(self, transaction_ids: Set[str]) -> None:
+        """Drop transactions from the shard buckets."""
+        for bucket in self._by_shard.values():
+            for transaction_id in transaction_ids:
+                bucket.pop(transaction_id, None)
+
     def remove_transaction(self, transaction_id: str) -> bool:
         """
         Remove a transaction from the pool by its ID.
@@ -40,6 +62,7 @@ class TransactionPool:
         initial_length = len(self.pending_transactions)
         self.pending_transactions = [t for t in self.pending_transactions 
                                    if t.transaction_id != transaction_id]
+        self._unindex({transaction_id})
         return len(self.pending_transactions) < initial_length
 
     def get_transaction(self, transaction_id: str) -> Optional[Transaction]:
@@ -71,9 +94,24 @@ class TransactionPool:
             return self.pending_transactions.copy()
         return self.pending_transactions[:limit]
 
+    def get_transactions_for_shard(self, shard_id: int) -> List[Transaction]:
+        """
+        Get the pending transactions sent from a shard.
+        
+        Args:
+            shard_id: ID of the sender shard
+            
+        Returns:
+            List of pending transactions, in arrival order
+        """
+        if self.shard_of is None:
+            raise ValueError("Transaction pool has no shard mapping")
+        return list(self._by_shard.get(shard_id, {}).values())
+
     def clear(self) -> None:
         """Clear all pending transactions from the pool."""
         self.pending_transactions.clear()
+        self._by_shard.clear()
 
     def remove_transactions(self, transactions: List[Transaction]) -> None:
         """
@@ -85,6 +123,7 @@ class TransactionPool:
         transaction_ids = {t.transaction_id for t in transactions}
         self.pending_transactions = [t for t in self.pending_transactions 
                                    if t.transaction_id not in transaction_ids]
+        self._unindex(transaction_ids)
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -98,18 +137,22 @@ class TransactionPool:
         }
 
     @staticmethod
-    def from_dict(pool_dict: Dict[str, Any]) -> 'TransactionPool':
+    def from_dict(pool_dict: Dict[str, Any],
+                  shard_of: Optional[Callable[[str], int]] = None) -> 'TransactionPool':
         """
         Create a TransactionPool instance from a dictionary representation.
         
         Args:
             pool_dict: Dictionary containing pool data
+            shard_of: Maps a sender address to its shard
             
         Returns:
             TransactionPool: A new TransactionPool instance
         """
-        pool = TransactionPool()
+        pool = TransactionPool(shard_of)
         pool.pending_transactions = [
             Transaction.from_dict(t) for t in pool_dict["pending_transactions"]
         ]
+        for transaction in pool.pending_transactions:
+            pool._index(transaction)
         return pool 
\ No newline at end of file
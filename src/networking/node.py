@@ -84,6 +84,7 @@ class Node:
         """Stop the node's server."""
         self.running = False
         self.socket.close()
+        self.blockchain.close()
         networking_logger.info("Node stopped")
 
     def connect_to_peer(self, peer_host: str, peer_port: int) -> bool:
@@ -1,10 +1,19 @@
 """Cryptographic utility functions for Vernachain."""
 
-from typing import Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 import hashlib
+import pyotp
 from Crypto.PublicKey import RSA
 from Crypto.Signature import pkcs1_15
 from Crypto.Hash import SHA256
+from src.utils.serialization import serialize_transaction
+
+# Fields left out of transaction hashes and Merkle leaves
+_UNHASHED_TX_FIELDS = ("signature", "hash")
+# Side byte on Merkle proof elements: where the sibling goes when hashing a pair
+MERKLE_LEFT = b"\x01"
+MERKLE_RIGHT = b"\x00"
 
 def generate_key_pair() -> Tuple[str, str]:
     """Generate a new RSA key pair.
@@ -32,6 +41,11 @@ def sign_message(private_key: str, message: str) -> bytes:
     signature = pkcs1_15.new(key).sign(h)
     return signature
 
+@lru_cache(maxsize=1024)
+def _pkcs1_verifier(public_key: str):
+    """Parse a PEM public key once into a PKCS#1 v1.5 verifier."""
+    return pkcs1_15.new(RSA.import_key(public_key))
+
 def verify_signature(public_key: str, message: str, signature: bytes) -> bool:
     """Verify a signature using RSA public key.
     
@@ -44,13 +58,24 @@ def verify_signature(public_key: str, message: str, signature: bytes) -> bool:
         bool: True if signature is valid
     """
     try:
-        key = RSA.import_key(public_key)
         h = SHA256.new(message.encode())
-        pkcs1_15.new(key).verify(h, signature)
+        _pkcs1_verifier(public_key).verify(h, signature)
         return True
     except (ValueError, TypeError):
         return False
 
+@lru_cache(maxsize=4096)
+def get_totp(secret: str) -> pyotp.TOTP:
+    """Get a reusable TOTP instance for a 2FA secret.
+    
+    Args:
+        secret: Base32 TOTP secret
+        
+    Returns:
+        pyotp.TOTP: TOTP instance shared by all callers with this secret
+    """
+    return pyotp.TOTP(secret)
+
 def hash_data(data: str) -> str:
     """Create SHA256 hash of data.
     
@@ -62,6 +87,96 @@ def hash_data(data: str) -> str:
     """
     return hashlib.sha256(data.encode()).hexdigest()
 
+def transaction_leaf_digest(transaction: Dict[str, Any]) -> bytes:
+    """Hash a transaction dictionary as a raw Merkle leaf.
+    
+    The leaf is the raw form of the transaction hash: the signature and
+    hash fields are left out and the rest is encoded with
+    serialize_transaction, so a leaf can be found from a transaction hash.
+    
+    Args:
+        transaction: Transaction dictionary
+        
+    Returns:
+        bytes: SHA-256 digest of the canonical transaction encoding
+    """
+    unsigned = {k: v for k, v in transaction.items() if k not in _UNHASHED_TX_FIELDS}
+    return hashlib.sha256(serialize_transaction(unsigned).encode()).digest()
+
+def merkle_layer(hashes: List[str]) -> List[str]:
+    """Hash a Merkle tree layer into the next layer up.
+    
+    Args:
+        hashes: Hash strings of the current layer; an odd last hash is
+            paired with itself
+        
+    Returns:
+        List[str]: Hash strings of the parent layer
+    """
+    sha256 = hashlib.sha256
+    pairs = iter(hashes)
+    parents = [sha256((left + right).encode()).hexdigest() for left, right in zip(pairs, pairs)]
+    if len(hashes) % 2 == 1:
+        parents.append(sha256((hashes[-1] * 2).encode()).hexdigest())
+    return parents
+
+def merkle_digest_layer(digests: List[bytes]) -> List[bytes]:
+    """Hash a Merkle tree layer of raw digests into the next layer up.
+    
+    Args:
+        digests: 32-byte digests of the current layer; an odd last digest
+            is paired with itself
+        
+    Returns:
+        List[bytes]: 32-byte digests of the parent layer
+    """
+    sha256 = hashlib.sha256
+    pairs = iter(digests)
+    parents = [sha256(left + right).digest() for left, right in zip(pairs, pairs)]
+    if len(digests) % 2 == 1:
+        parents.append(sha256(digests[-1] * 2).digest())
+    return parents
+
+def merkle_digest_proof(layers: List[List[bytes]], position: int) -> List[bytes]:
+    """Build a Merkle proof for a leaf from the tree's digest layers.
+    
+    Args:
+        layers: Digest layers, leaves first and root last
+        position: Index of the leaf in the first layer
+        
+    Returns:
+        List[bytes]: One element per level: a side byte (MERKLE_LEFT if the
+            sibling is hashed on the left) followed by the 32-byte sibling
+    """
+    proof = []
+    for digests in layers:
+        if len(digests) <= 1:
+            break
+        # An odd last digest is paired with itself
+        sibling = digests[min(position ^ 1, len(digests) - 1)]
+        proof.append((MERKLE_LEFT if position & 1 else MERKLE_RIGHT) + sibling)
+        position //= 2
+    return proof
+
+def merkle_proof_root(leaf: bytes, proof: List[bytes]) -> bytes:
+    """Hash a leaf up through a proof from merkle_digest_proof.
+    
+    Args:
+        leaf: 32-byte leaf digest
+        proof: Proof elements, leaf level first
+        
+    Returns:
+        bytes: Root digest implied by the proof
+    """
+    sha256 = hashlib.sha256
+    current = leaf
+    for element in proof:
+        if element[:1] == MERKLE_LEFT:
+            current = sha256(element[1:] + current).digest()
+        else:
+            current = sha256(current + element[1:]).digest()
+    return current
+
 def generate_merkle_root(hashes: list) -> str:
     """Generate Merkle root from list of hashes.
     
@@ -75,13 +190,6 @@ def generate_merkle_root(hashes: list) -> str:
         return ""
     
     while len(hashes) > 1:
-        if len(hashes) % 2 == 1:
-            hashes.append(hashes[-1])
-        
-        next_level = []
-        for i in range(0, len(hashes), 2):
-            combined = hashes[i] + hashes[i+1]
-            next_level.append(hash_data(combined))
-        hashes = next_level
+        hashes = merkle_layer(hashes)
         
     return hashes[0] 
\ No newline at end of file
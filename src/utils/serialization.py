@@ -15,7 +15,7 @@ def serialize_transaction(transaction: Dict[str, Any]) -> str:
     """
     # Convert any datetime objects to ISO format
     tx_copy = transaction.copy()
-    if 'timestamp' in tx_copy:
+    if isinstance(tx_copy.get('timestamp'), datetime):
         tx_copy['timestamp'] = tx_copy['timestamp'].isoformat()
         
     # Convert any bytes to hex strings
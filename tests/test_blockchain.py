@@ -3,19 +3,24 @@
 import pytest
 from datetime import datetime, timedelta
 from src.blockchain.blockchain import Blockchain
+from src.blockchain.block import Block
 from src.blockchain.transaction import Transaction
+from src.blockchain.transaction_pool import TransactionPool
 from src.utils.crypto import generate_key_pair, sign_message
 
+
 @pytest.fixture
 def blockchain():
     """Create a blockchain instance for testing."""
     return Blockchain()
 
+
 @pytest.fixture
 def validator_keys():
     """Generate validator keys for testing."""
     return generate_key_pair()
 
+
 def test_genesis_block(blockchain):
     """Test genesis block creation."""
     genesis = blockchain.get_latest_block()
@@ -25,6 +30,7 @@ def test_genesis_block(blockchain):
     assert len(genesis['transactions']) == 0
     assert genesis['validator'] is None
 
+
 def test_add_transaction(blockchain):
     """Test adding transactions to the blockchain."""
     # Create transaction
@@ -47,6 +53,7 @@ def test_add_transaction(blockchain):
     invalid_tx['value'] = -100
     assert not blockchain.add_transaction(invalid_tx)
 
+
 def test_create_block(blockchain, validator_keys):
     """Test block creation."""
     private_key, public_key = validator_keys
@@ -73,6 +80,7 @@ def test_create_block(blockchain, validator_keys):
     assert len(block['transactions']) == 3
     assert block['validator'] == public_key
 
+
 def test_add_block(blockchain, validator_keys):
     """Test adding blocks to the blockchain."""
     private_key, public_key = validator_keys
@@ -89,6 +97,7 @@ def test_add_block(blockchain, validator_keys):
     assert len(blockchain.chain) == 2
     assert blockchain.get_latest_block()['hash'] == block['hash']
 
+
 def test_validator_operations(blockchain):
     """Test validator management."""
     # Add validator
@@ -103,6 +112,7 @@ def test_validator_operations(blockchain):
     assert success
     assert address not in blockchain.validators
 
+
 def test_get_balance(blockchain):
     """Test balance calculation."""
     address = "0x1234567890abcdef1234567890abcdef12345678"
@@ -139,6 +149,7 @@ def test_get_balance(blockchain):
     balance = blockchain.get_balance(address)
     assert balance == 70.0  # 100 received - 30 sent
 
+
 def test_blockchain_validation(blockchain, validator_keys):
     """Test blockchain validation."""
     private_key, public_key = validator_keys
@@ -157,6 +168,7 @@ def test_blockchain_validation(blockchain, validator_keys):
     blockchain.chain[1]['hash'] = 'invalid_hash'
     assert not blockchain.is_valid_chain()
 
+
 def test_fork_resolution(blockchain, validator_keys):
     """Test blockchain fork resolution."""
     private_key, public_key = validator_keys
@@ -181,4 +193,156 @@ def test_fork_resolution(blockchain, validator_keys):
     signature2 = sign_message(private_key, fork_block['hash'])
     
     blockchain.add_block(original_block, signature1)
-    assert not blockchain.add_block(fork_block, signature2)  # Should reject fork 
\ No newline at end of file
+    assert not blockchain.add_block(fork_block, signature2)  # Should reject fork
+
+
+def test_cross_shard_merkle_proof(blockchain):
+    """Test Merkle proofs for shard transactions verify against the state root."""
+    addresses = ["0x" + str(i) * 40 for i in range(1, 4)]
+    transactions = [
+        Transaction(addresses[i], addresses[(i + 1) % 3], 10.0 + i, i)
+        for i in range(3)
+    ]
+    
+    shard_chain = blockchain.shard_chains[0]
+    block = Block(
+        index=len(shard_chain.chain),
+        transactions=[tx.to_dict() for tx in transactions],
+        timestamp=datetime.now().timestamp(),
+        previous_hash=shard_chain.chain[-1].hash,
+        validator="0x" + "9" * 40
+    )
+    assert shard_chain.add_block(block)
+    blockchain.master_chain.update_shard_info(0, shard_chain.get_state_root(), len(shard_chain.chain))
+    
+    # Every transaction, wherever it sits in the tree, has a valid proof
+    for tx in transactions:
+        proof = blockchain._create_merkle_proof(0, tx.calculate_hash())
+        assert proof
+        assert shard_chain._verify_merkle_proof(tx.to_dict(), proof)
+        
+        message_hash = blockchain.master_chain.create_cross_shard_message(
+            0, 1, tx.calculate_hash(), proof
+        )
+        assert blockchain.master_chain.verify_cross_shard_message(message_hash)
+        
+    # A proof for one transaction does not verify another
+    proof = blockchain._create_merkle_proof(0, transactions[0].calculate_hash())
+    assert not shard_chain._verify_merkle_proof(transactions[1].to_dict(), proof)
+
+
+def test_block_hash_memo_invalidation():
+    """Test block hashes are stable and follow reassigned fields."""
+    tx = Transaction("0x" + "1" * 40, "0x" + "2" * 40, 5.0, 0)
+    block = Block(1, [tx.to_dict()], 1700000000.0, "0" * 64, "0x" + "9" * 40)
+    
+    # Repeated calls agree with each other and with a full recalculation
+    assert block.calculate_hash() == block.calculate_hash() == block.hash
+    assert block.recalculate_hash() == block.hash
+    original = block.to_dict()
+    assert block.to_dict() is original
+    
+    # Reassigning a hashed field drops the memoized hash and cached dict
+    block.nonce = 1
+    assert block.calculate_hash() != original["hash"]
+    assert block.calculate_hash() == block.recalculate_hash()
+    assert block.to_dict()["nonce"] == 1
+    
+    block.transactions = []
+    assert block.calculate_hash() == block.recalculate_hash()
+    assert block.to_dict()["merkle_root"] == ""
+    
+    # Validation recomputes, so an in-place edit is caught
+    block.transactions = [tx.to_dict()]
+    block.hash = block.calculate_hash()
+    assert block.is_valid(0)
+    block.transactions[0]["value"] = 500.0
+    assert not block.is_valid(0)
+
+
+def test_transaction_hash_memo_invalidation():
+    """Test transaction hashes are stable and follow reassigned fields."""
+    tx = Transaction("0x" + "1" * 40, "0x" + "2" * 40, 5.0, 0)
+    original = tx.calculate_hash()
+    assert tx.calculate_hash() == original == tx.hash
+    
+    tx.value = 6.0
+    changed = tx.calculate_hash()
+    assert changed != original
+    tx.value = 5.0
+    assert tx.calculate_hash() == original
+    
+    # A claimed hash from a dict is not trusted
+    data = tx.to_dict()
+    data["hash"] = "f" * 64
+    restored = Transaction.from_dict(data)
+    assert restored.calculate_hash() == original
+
+
+class _PooledTransaction:
+    """Minimal pooled transaction for exercising the shard buckets."""
+    
+    def __init__(self, transaction_id: str, sender: str):
+        self.transaction_id = transaction_id
+        self.sender = sender
+        
+    def is_valid(self) -> bool:
+        return True
+
+
+def test_pool_shard_buckets_after_removal():
+    """Test shard buckets match the pending list after removals."""
+    pool = TransactionPool(lambda address: int(address[-1]) % 2)
+    transactions = [_PooledTransaction(f"tx{i}", f"0x{i}") for i in range(8)]
+    for tx in transactions:
+        assert pool.add_transaction(tx)
+        
+    pool.remove_transactions(transactions[1:6:2])
+    assert pool.remove_transaction("tx6")
+    assert not pool.remove_transaction("tx6")
+    
+    pending = pool.get_transactions()
+    assert [tx.transaction_id for tx in pending] == ["tx0", "tx2", "tx4", "tx7"]
+    for shard_id in (0, 1):
+        assert pool.get_transactions_for_shard(shard_id) == [
+            tx for tx in pending if int(tx.sender[-1]) % 2 == shard_id
+        ]
+        
+    pool.clear()
+    assert pool.get_transactions_for_shard(0) == []
+
+
+def test_is_valid_chain_incremental(blockchain):
+    """Test chain validation on a new chain and as blocks are appended."""
+    assert blockchain.is_valid_chain()
+    assert blockchain.is_valid_chain()
+    
+    validator = "0x" + "9" * 40
+    blockchain.consensus.add_validator(validator, 1000.0)
+    
+    def append_block(previous_hash):
+        block = {
+            'index': len(blockchain.chain),
+            'timestamp': datetime.now(),
+            'transactions': [],
+            'previous_hash': previous_hash,
+            'validator': validator,
+            'signature': None
+        }
+        block['hash'] = blockchain._calculate_block_hash(block)
+        blockchain.chain.append(block)
+        
+    append_block(blockchain.chain[-1]['hash'])
+    assert blockchain.is_valid_chain()
+    
+    # Blocks past the validated tip are still checked
+    append_block('0' * 64)
+    assert not blockchain.is_valid_chain()
+    
+    # Replacing the chain drops the validated prefix
+    blockchain.chain.pop()
+    restored = Blockchain.from_dict(blockchain.to_dict())
+    assert restored.is_valid_chain()
+    restored.chain[1]['validator'] = "0x" + "8" * 40
+    restored.invalidate_validation_cache()
+    assert not restored.is_valid_chain()
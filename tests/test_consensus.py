@@ -0,0 +1,64 @@
+"""Tests for stake-weighted validator selection."""
+
+import random
+from collections import Counter
+
+import pytest
+from src.blockchain.consensus import ProofOfStake
+
+
+@pytest.fixture
+def consensus():
+    """Create a proof of stake instance with three validators."""
+    pos = ProofOfStake()
+    pos.add_validator("0x" + "1" * 40, 100.0)
+    pos.add_validator("0x" + "2" * 40, 300.0)
+    pos.add_validator("0x" + "3" * 40, 600.0)
+    return pos
+
+
+def _selection_shares(consensus, draws=30000):
+    """Draw validators and return each address's share of the draws."""
+    counts = Counter(consensus.select_validator().address for _ in range(draws))
+    return {address: count / draws for address, count in counts.items()}
+
+
+def test_select_validator_follows_stake(consensus):
+    """Test single selection frequencies match stake weights."""
+    random.seed(1)
+    shares = _selection_shares(consensus)
+    
+    assert shares["0x" + "1" * 40] == pytest.approx(0.1, abs=0.02)
+    assert shares["0x" + "2" * 40] == pytest.approx(0.3, abs=0.02)
+    assert shares["0x" + "3" * 40] == pytest.approx(0.6, abs=0.02)
+
+
+def test_select_validator_after_stake_changes(consensus):
+    """Test selection picks up stake updates and removals."""
+    random.seed(2)
+    _selection_shares(consensus, draws=10)
+    
+    consensus.add_validator("0x" + "1" * 40, 900.0)
+    consensus.remove_validator("0x" + "3" * 40)
+    shares = _selection_shares(consensus)
+    
+    assert "0x" + "3" * 40 not in shares
+    assert shares["0x" + "1" * 40] == pytest.approx(0.75, abs=0.02)
+    assert shares["0x" + "2" * 40] == pytest.approx(0.25, abs=0.02)
+    
+    consensus.remove_validator("0x" + "1" * 40)
+    consensus.remove_validator("0x" + "2" * 40)
+    assert consensus.select_validator() is None
+
+
+def test_select_validators_distinct_and_weighted(consensus):
+    """Test multi-selection returns distinct validators weighted by stake."""
+    random.seed(3)
+    firsts = Counter()
+    for _ in range(10000):
+        selected = consensus.select_validators(2)
+        assert len({v.address for v in selected}) == 2
+        firsts[selected[0].address] += 1
+        
+    assert len(consensus.select_validators(5)) == 3
+    assert firsts["0x" + "3" * 40] / 10000 == pytest.approx(0.6, abs=0.02)
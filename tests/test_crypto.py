@@ -72,7 +72,13 @@ def test_merkle_root():
     
     assert isinstance(root, str)
     assert len(root) == 64
-    
+
+    # Odd layers duplicate their own last hash, not the last leaf
+    a, b, c, d, e, f = [hash_data(f"tx{i}") for i in range(6)]
+    ab, cd, ef = hash_data(a + b), hash_data(c + d), hash_data(e + f)
+    expected = hash_data(hash_data(ab + cd) + hash_data(ef + ef))
+    assert generate_merkle_root([a, b, c, d, e, f]) == expected
+
     # Test empty list
     assert generate_merkle_root([]) == ""
     
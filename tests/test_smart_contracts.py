@@ -0,0 +1,85 @@
+"""Tests for the ERC1155 multi-token contract."""
+
+from pathlib import Path
+
+import pytest
+from src.blockchain.smart_contracts.vm import GasCounter
+
+CONTRACT_SOURCE = (
+    Path(__file__).resolve().parents[1] / "src/blockchain/smart_contracts/erc1155.py"
+).read_text()
+OWNER = "0x" + "a" * 40
+ALICE = "0x" + "b" * 40
+BOB = "0x" + "c" * 40
+
+
+class ContractEnv:
+    """Execution environment set up the way SmartContractVM.call_contract does."""
+    
+    def __init__(self, gas_limit: int = 1000000):
+        self.globals = {"gas_counter": GasCounter(gas_limit), "sender": None}
+        exec(CONTRACT_SOURCE, self.globals)
+        
+    def call(self, sender, function, *args):
+        """Call a contract function as sender with a fresh gas counter."""
+        self.globals["sender"] = sender
+        self.globals["gas_counter"] = GasCounter(self.globals["gas_counter"].gas_limit)
+        if function == "__init__":
+            return self.globals["Contract"](*args)
+        return getattr(self.contract, function)(*args)
+        
+    @property
+    def gas_used(self) -> int:
+        return self.globals["gas_counter"].gas_used
+
+
+@pytest.fixture
+def env():
+    """Deploy an ERC1155 contract owned by OWNER."""
+    env = ContractEnv()
+    env.contract = env.call(OWNER, "__init__", "Items", "https://example.com/{id}.json")
+    return env
+
+
+def test_erc1155_mint_transfer_burn(env):
+    """Test balances and supply through a mint, transfer and burn round trip."""
+    assert env.call(OWNER, "mint", ALICE, 1, 100)
+    assert env.gas_used == 1 + 2 * 5
+    assert env.call(OWNER, "mint_batch", ALICE, [2, 3], [20, 30])
+    assert env.gas_used == 1 + 4 * 5
+    
+    assert env.call(ALICE, "safe_transfer_from", ALICE, BOB, 1, 40)
+    assert env.call(ALICE, "safe_batch_transfer_from", ALICE, BOB, [2, 3], [5, 30])
+    assert env.call(BOB, "balance_of_batch", [ALICE, BOB, ALICE, BOB], [1, 1, 2, 3]) == [60, 40, 15, 30]
+    assert env.gas_used == 4 * 3
+    
+    assert env.call(BOB, "burn", 1, 15)
+    assert env.call(BOB, "burn_batch", [3], [30])
+    assert env.call(BOB, "balance_of", BOB, 1) == 25
+    assert env.contract.token_supplies == {1: 85, 2: 20, 3: 0}
+    assert env.call(BOB, "token_uri", 7) == "https://example.com/7.json"
+
+
+def test_erc1155_authorization(env):
+    """Test owner-only minting, operator approval and balance checks."""
+    with pytest.raises(AssertionError, match="Not contract owner"):
+        env.call(ALICE, "mint", ALICE, 1, 10)
+    env.call(OWNER, "mint", ALICE, 1, 10)
+    
+    with pytest.raises(AssertionError, match="Not authorized"):
+        env.call(BOB, "safe_transfer_from", ALICE, BOB, 1, 5)
+    assert env.call(ALICE, "set_approval_for_all", BOB, True)
+    assert env.call(BOB, "is_approved_for_all", ALICE, BOB)
+    assert env.call(BOB, "safe_transfer_from", ALICE, BOB, 1, 5)
+    
+    with pytest.raises(AssertionError, match="Insufficient balance"):
+        env.call(ALICE, "burn", 1, 6)
+    assert env.call(ALICE, "balance_of", ALICE, 1) == 5
+
+
+def test_erc1155_out_of_gas():
+    """Test calls fail once the gas limit is exceeded."""
+    env = ContractEnv(gas_limit=20)
+    env.contract = env.call(OWNER, "__init__", "Items", "{id}")
+    with pytest.raises(Exception, match="Out of gas"):
+        env.call(OWNER, "mint_batch", ALICE, [1, 2], [1, 1])